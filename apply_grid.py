@@ -1,7 +1,13 @@
 
 import os
 import sys
-from PIL import Image, ImageDraw
+import time
+import numpy as np
+from PIL import Image
+
+from metrics import track
+from pixel_cache import load_rgb
+from progress import emit, is_cancelled
 
 # Grid configurations based on breakpoints
 GRID_CONFIG = {
@@ -14,7 +20,24 @@ GRID_CONFIG = {
 # Grid color (light pink with transparency)
 GRID_COLOR = (255, 182, 193, 100) # R, G, B, Alpha
 
-def draw_grid(image_path, output_path):
+# Fixed-point precision used by Pillow's alpha_composite
+ALPHA_PRECISION_BITS = 7
+
+def blend_grid_color(region):
+    """
+    Blends GRID_COLOR over an opaque RGB region with the same integer
+    arithmetic as Image.alpha_composite, so output pixels match exactly.
+    """
+    r, g, b, alpha = GRID_COLOR
+    out_alpha = alpha * 255 + 255 * (255 - alpha)
+    coef1 = alpha * 255 * 255 * (1 << ALPHA_PRECISION_BITS) // out_alpha
+    coef2 = 255 * (1 << ALPHA_PRECISION_BITS) - coef1
+    tmp = np.array((r, g, b), dtype=np.uint32) * coef1 + region.astype(np.uint32) * coef2
+    tmp += 0x80 << ALPHA_PRECISION_BITS
+    # ((x >> 8) + x) >> 8 is Pillow's rounded division by 255
+    return ((((tmp >> 8) + tmp) >> 8) >> ALPHA_PRECISION_BITS).astype(np.uint8)
+
+def draw_grid(image_path, output_path, metrics=None, cache=None):
     """
     Draws a grid on an image based on its breakpoint (inferred from path)
     and saves it to the output path.
@@ -47,12 +70,12 @@ def draw_grid(image_path, output_path):
         columns = config['columns']
         gutter = config['gutter']
 
-        with Image.open(image_path).convert("RGBA") as base_image:
-            img_width, img_height = base_image.size
-
-            # Create a transparent layer for the grid
-            overlay = Image.new("RGBA", base_image.size, (255, 255, 255, 0))
-            draw = ImageDraw.Draw(overlay)
+        labels = {"breakpoint": breakpoint, "file": os.path.basename(image_path)}
+        with track(metrics, "grid_decode", **labels):
+            # Read-only view of the decoded pixels, shared with the comparison step
+            base_pixels = load_rgb(image_path, cache)
+        with track(metrics, "grid", **labels):
+            img_height, img_width = base_pixels.shape[:2]
 
             # --- INTEGER-BASED GRID CALCULATION ---
             # All calculations use integers to avoid floating point errors.
@@ -69,26 +92,25 @@ def draw_grid(image_path, output_path):
             base_column_width = column_total_width // columns
             remainder = column_total_width % columns
 
+            combined = np.array(base_pixels)
             current_x = margin
             for i in range(columns):
                 # Add 1px to the first 'remainder' columns
                 col_width = base_column_width + (1 if i < remainder else 0)
 
-                draw.rectangle(
-                    [(current_x, 0), (current_x + col_width, img_height)],
-                    fill=GRID_COLOR
-                )
+                # Column spans current_x..current_x + col_width inclusive, full height
+                column = combined[:, current_x:current_x + col_width + 1]
+                column[...] = blend_grid_color(column)
                 # Move to the start of the next column
                 current_x += col_width + gutter
 
-            # Composite the overlay onto the base image
-            combined = Image.alpha_composite(base_image, overlay)
-            
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
             # Save the result as PNG
-            combined.convert("RGB").save(output_path, "PNG")
+            with track(metrics, "grid_write", **labels) as rec:
+                Image.fromarray(combined).save(output_path, "PNG")
+                rec["bytes"] = os.path.getsize(output_path)
 
     except FileNotFoundError:
         # print(f"Error: Source file not found at {image_path}")
@@ -98,12 +120,16 @@ def draw_grid(image_path, output_path):
         pass
 
 
-def process_screenshots(source_dir, output_dir_base):
+def process_screenshots(source_dir, output_dir_base, metrics=None, progress=None, cancel=None, cache=None):
     """
     Finds all screenshots in the source directory, applies grids,
     and saves them to the output directory.
+    Reports one progress event per image and stops between images once cancel is set.
+    Pass a PixelCache as cache to reuse pixels already decoded by the comparison step.
     """
     print(f"Processing screenshots from: {source_dir}")
+    # Collect the work list up front so progress has a total
+    jobs = []
     for root, dirs, files in os.walk(source_dir):
         # Skip specific subdirectories
         if 'comparison_results' in root or 'screenshots_with_grid' in root:
@@ -116,8 +142,17 @@ def process_screenshots(source_dir, output_dir_base):
                 # Create corresponding output path
                 relative_path = os.path.relpath(source_path, source_dir)
                 output_path = os.path.join(output_dir_base, relative_path)
-                
-                draw_grid(source_path, output_path)
+                jobs.append((source_path, output_path, relative_path))
+
+    emit(progress, "start", "grid", total=len(jobs))
+    for source_path, output_path, relative_path in jobs:
+        if is_cancelled(cancel):
+            print("Grid application cancelled.")
+            break
+        started = time.perf_counter()
+        draw_grid(source_path, output_path, metrics, cache)
+        emit(progress, "item", "grid", bytes=os.path.getsize(source_path),
+             duration=time.perf_counter() - started, label=relative_path)
     print(f"Output generated in: {output_dir_base}")
 
 
@@ -0,0 +1,204 @@
+"""
+브라우저 없이 합성 PNG 쌍으로 compare_images와 draw_grid만 측정합니다.
+
+사용 예:
+    python -m benchmarks.bench_images
+    python -m benchmarks.bench_images --full --repeat 5
+    python -m benchmarks.bench_images --compare results/old.json results/new.json
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.common import (PROJECT_ROOT, compare_results, latency_summary,
+                               measure_stage, save_result)
+
+from apply_grid import draw_grid
+from compare_screenshots import compare_images
+from pixel_cache import PixelCache
+
+# --- Configuration ---
+# 기본 케이스: (너비, 높이, 노이즈 비율, 이동 영역 높이)
+QUICK_CASES = [
+    (360, 6000, 0.0, 0),
+    (768, 8000, 0.001, 0),
+    (1280, 10000, 0.001, 200),
+    (1920, 12000, 0.01, 400),
+]
+
+# --full 케이스: 실제 서비스에서 나오는 가장 긴 페이지(30000px)까지 포함
+FULL_CASES = QUICK_CASES + [
+    (360, 30000, 0.001, 400),
+    (1024, 20000, 0.001, 400),
+    (1920, 30000, 0.01, 800),
+]
+
+# 노이즈 픽셀의 최대 밝기 변화량 (PIXEL_DIFF_THRESHOLD 근처 값이 섞이도록 설정)
+NOISE_AMPLITUDE = 40
+
+# 합성 이미지 캐시 폴더 (같은 파라미터는 다시 생성하지 않음)
+SYNTHETIC_DIR = os.path.join(tempfile.gettempdir(), "autoscreenshot_bench_images")
+
+# draw_grid가 Breakpoint를 추론할 수 있도록 폴더 이름에 붙일 접미사
+WIDTH_TO_BREAKPOINT = [(1280, "XL"), (1024, "LG"), (768, "MD"), (0, "SM")]
+
+
+def case_name(width, height, noise, shift):
+    return f"{width}x{height}_n{noise:g}_s{shift}"
+
+
+def _breakpoint_for(width):
+    return next(name for min_width, name in WIDTH_TO_BREAKPOINT if width >= min_width)
+
+
+def render_synthetic_page(width, height, seed=0):
+    """헤더, 카드, 텍스트 줄을 흉내 낸 페이지 이미지를 생성합니다."""
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width, 3), 255, dtype=np.uint8)
+    img[:80] = (29, 53, 87)
+    y = 120
+    while y < height - 40:
+        block_h = int(rng.integers(40, 320))
+        x = 16
+        while x < width - 16:
+            block_w = int(rng.integers(min(120, width // 3), max(min(480, width - 32), 121)))
+            color = rng.integers(0, 256, size=3, dtype=np.uint8)
+            img[y:y + block_h, x:min(x + block_w, width - 16)] = color
+            # 텍스트 줄 흉내 (가는 가로줄)
+            img[y + 8:y + block_h - 8:12, x + 8:min(x + block_w, width - 16) - 8] = 40
+            x += block_w + 24
+        y += block_h + 24
+    return img
+
+
+def make_pair(width, height, noise, shift, seed=0):
+    """기준 이미지와 노이즈/영역 이동을 넣은 비교 이미지를 PNG로 저장하고 경로를 반환합니다."""
+    name = case_name(width, height, noise, shift)
+    directory = os.path.join(SYNTHETIC_DIR, f"chrome_{width} - {_breakpoint_for(width)}")
+    path1 = os.path.join(directory, f"{name}.png")
+    path2 = os.path.join(SYNTHETIC_DIR, f"edge_{width} - {_breakpoint_for(width)}", f"{name}.png")
+    if os.path.exists(path1) and os.path.exists(path2):
+        return path1, path2
+
+    base = render_synthetic_page(width, height, seed)
+    variant = base.copy()
+    rng = np.random.default_rng(seed + 1)
+    if noise:
+        count = int(width * height * noise)
+        ys = rng.integers(0, height, size=count)
+        xs = rng.integers(0, width, size=count)
+        delta = rng.integers(-NOISE_AMPLITUDE, NOISE_AMPLITUDE + 1, size=(count, 1))
+        variant[ys, xs] = np.clip(variant[ys, xs].astype(np.int16) + delta, 0, 255).astype(np.uint8)
+    if shift:
+        # 페이지 중간 영역을 아래로 몇 px 밀어 레이아웃 어긋남을 흉내
+        top = height // 3
+        variant[top:top + shift] = np.roll(variant[top:top + shift], 7, axis=0)
+
+    for path, array in ((path1, base), (path2, variant)):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.fromarray(array).save(path)
+    return path1, path2
+
+
+def run_case(width, height, noise, shift, repeat):
+    """
+    한 케이스의 compare/grid 소요 시간과 메모리 최대치를 측정합니다.
+    cold는 반복마다 빈 픽셀 캐시를 새로 만들어 디코딩과 캐시 쓰기를 포함하고,
+    warm은 미리 채운 캐시에서 읽는 경우입니다 (GUI에서 비교 후 그리드를 적용하는 경우).
+    """
+    path1, path2 = make_pair(width, height, noise, shift)
+    out_dir = tempfile.mkdtemp(prefix="bench_images_")
+    result = {}
+    for stage, func, args in (
+        ("compare", compare_images, (path1, path2, os.path.join(out_dir, "diff.png"))),
+        ("grid", draw_grid, (path1, os.path.join(out_dir, os.path.basename(os.path.dirname(path1)), "grid.png"))),
+    ):
+        for mode in ("cold", "warm"):
+            samples = []
+            peak_traced = 0
+            peak_rss = None
+            warm_dir = tempfile.mkdtemp(prefix="bench_pixel_cache_", dir=out_dir)
+            warm_cache = PixelCache(warm_dir)
+            if mode == "warm":
+                func(*args, cache=warm_cache)
+            for _ in range(repeat):
+                cache_dir = tempfile.mkdtemp(prefix="bench_pixel_cache_", dir=out_dir) if mode == "cold" else None
+                cache = PixelCache(cache_dir) if mode == "cold" else warm_cache
+                with measure_stage() as measured:
+                    func(*args, cache=cache)
+                samples.append(measured["seconds"])
+                peak_traced = max(peak_traced, measured["peak_traced_bytes"])
+                if measured["peak_rss_bytes"] is not None:
+                    peak_rss = max(peak_rss or 0, measured["peak_rss_bytes"])
+                if cache_dir:
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+            result[f"{stage}_{mode}"] = {
+                "latency": latency_summary(samples),
+                "megapixels_per_sec": width * height / 1e6 / min(samples),
+                "peak_traced_bytes": peak_traced,
+                "peak_rss_bytes": peak_rss,
+            }
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return result
+
+
+def run_case_isolated(case, repeat):
+    """프로세스 최대 RSS가 케이스별로 분리되도록 하위 프로세스에서 실행합니다."""
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_images", "--case", json.dumps(case), "--repeat", str(repeat)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 이미지 기반 compare/grid 마이크로 벤치마크")
+    parser.add_argument("--full", action="store_true", help="30000px 높이까지 모든 케이스 실행")
+    parser.add_argument("--repeat", type=int, default=3, help="케이스별 반복 횟수")
+    parser.add_argument("--no-isolate", action="store_true", help="모든 케이스를 현재 프로세스에서 실행")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="두 결과 파일 비교")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.case:
+        print(json.dumps(run_case(*json.loads(args.case), args.repeat)))
+        return
+
+    stages = {}
+    for case in FULL_CASES if args.full else QUICK_CASES:
+        if args.no_isolate:
+            result = run_case(*case, args.repeat)
+        else:
+            result = run_case_isolated(list(case), args.repeat)
+        name = case_name(*case)
+        for stage, data in result.items():
+            # compare_results에서 단계별로 비교할 수 있도록 throughput 키로 저장
+            stages[f"{stage}_{name}"] = {**data, "throughput": data["megapixels_per_sec"], "unit": "MP/s"}
+            rss = f"{data['peak_rss_bytes'] / 2**20:.0f} MiB" if data["peak_rss_bytes"] else "n/a (psutil 필요)"
+            print(
+                f"{stage:<14}{name:<28}p50 {data['latency']['p50']:.3f}s  "
+                f"{data['megapixels_per_sec']:.1f} MP/s  peak RSS {rss}"
+            )
+
+    save_result("images", {
+        "config": {"full": args.full, "repeat": args.repeat, "isolated": not args.no_isolate},
+        "stages": stages,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+로컬 픽스처 사이트를 대상으로 로그인 → 캡처 → 비교 → 그리드 적용 전체 과정을 측정합니다.
+
+사용 예:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --browsers chrome,edge --runs 3
+    python -m benchmarks.bench_pipeline --compare results/old.json results/new.json
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import urllib.parse
+
+from benchmarks.common import (PROJECT_ROOT, compare_results, latency_summary,
+                               measure_stage, save_result)
+from benchmarks.fixture_site import FixtureServer
+
+from apply_grid import process_screenshots
+from autologin import login
+from compare_screenshots import run_comparison
+from config import DEFAULT_BREAKPOINTS
+from metrics import Metrics
+from pixel_cache import CACHE_DIR_NAME, PixelCache
+from screenshot import capture_screenshots, get_urls_from_file
+
+# 캡처 단계에서 세부 단계별 지연 시간으로 집계할 Metrics 단계
+CAPTURE_STAGES = ("navigation", "readiness_wait", "resize", "cdp_capture", "decode", "write")
+
+
+def create_headless_driver(browser_type):
+    from selenium import webdriver
+
+    if browser_type == "chrome":
+        options = webdriver.ChromeOptions()
+    elif browser_type == "edge":
+        options = webdriver.EdgeOptions()
+    else:
+        raise ValueError(f"지원하지 않는 브라우저: {browser_type}")
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--hide-scrollbars")
+    if browser_type == "chrome":
+        return webdriver.Chrome(options=options)
+    return webdriver.Edge(options=options)
+
+
+def _browser_pids(driver):
+    # chromedriver/msedgedriver 프로세스 (브라우저 프로세스는 그 하위에 있음)
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return [process.pid] if process else []
+
+
+def _stage_result(measured, items, unit, samples=None):
+    """samples는 같은 종류의 작업(이미지 한 장 비교 등)의 소요 시간일 때만 넘깁니다."""
+    seconds = measured["seconds"]
+    per = 60.0 if unit == "pages/min" else 1.0
+    result = {
+        "items": items,
+        "seconds": seconds,
+        "throughput": items / seconds * per if seconds else None,
+        "unit": unit,
+        "peak_traced_bytes": measured["peak_traced_bytes"],
+        "peak_rss_bytes": measured["peak_rss_bytes"],
+        "peak_browser_rss_bytes": measured.get("peak_browser_rss_bytes"),
+    }
+    if samples is not None:
+        result["latency"] = latency_summary(samples)
+    return result
+
+
+def run_pipeline(base_url, urls, browsers, work_dir):
+    """파이프라인을 한 번 실행하고 단계별 결과를 반환합니다."""
+    stages = {}
+    breakpoints = dict(DEFAULT_BREAKPOINTS)
+
+    # 브라우저가 하나뿐이면 같은 브라우저로 한 번 더 캡처하여 'edge' 폴더를 채움
+    # (비교 단계가 항상 Chrome/Edge 쌍을 갖도록)
+    passes = [(b, b) for b in browsers]
+    if len(browsers) == 1:
+        passes.append((browsers[0], "edge" if browsers[0] == "chrome" else "chrome"))
+
+    full_urls = [urllib.parse.urljoin(base_url, path) for path in urls]
+    drivers = {}
+    try:
+        for driver_type, label in passes:
+            if driver_type not in drivers:
+                drivers[driver_type] = create_headless_driver(driver_type)
+                with measure_stage(_browser_pids(drivers[driver_type])) as measured:
+                    ok = login(drivers[driver_type], "bench", "bench", urllib.parse.urljoin(base_url, "login"))
+                if not ok:
+                    raise RuntimeError(f"{driver_type} 픽스처 로그인 실패")
+                stages[f"login_{driver_type}"] = _stage_result(measured, 1, "logins/sec", [measured["seconds"]])
+
+            metrics = Metrics()
+            with measure_stage(_browser_pids(drivers[driver_type])) as measured:
+                capture_screenshots(drivers[driver_type], full_urls, work_dir, label, breakpoints, metrics)
+            # 성격이 다른 세부 단계를 하나의 백분위수로 합치지 않고 단계별로만 보고
+            result = _stage_result(measured, len(full_urls), "pages/min")
+            result["per_stage"] = {
+                name: latency_summary([r["seconds"] for r in metrics.records if r["stage"] == name])
+                for name in CAPTURE_STAGES
+            }
+            stages[f"capture_{label}"] = result
+    finally:
+        for driver in drivers.values():
+            driver.quit()
+
+    image_count = sum(len(files) for _, _, files in os.walk(work_dir))
+
+    # GUI와 같이 저장 경로별 실행 캐시를 사용 (비교에서 디코딩한 픽셀을 그리드 적용이 재사용)
+    cache = PixelCache(os.path.join(work_dir, CACHE_DIR_NAME))
+    metrics = Metrics()
+    with measure_stage() as measured:
+        run_comparison(work_dir, metrics=metrics, cache=cache)
+    samples = [r["seconds"] for r in metrics.records if r["stage"] == "diff"]
+    stages["compare"] = _stage_result(measured, len(samples), "images/sec", samples)
+
+    # apply_grid는 저장 경로 아래 screenshots 폴더를 입력으로 사용
+    source_dir = os.path.join(work_dir, "screenshots")
+    os.makedirs(source_dir, exist_ok=True)
+    for name in os.listdir(work_dir):
+        if name.startswith(("chrome_", "edge_")):
+            shutil.move(os.path.join(work_dir, name), source_dir)
+
+    metrics = Metrics()
+    with measure_stage() as measured:
+        process_screenshots(source_dir, os.path.join(work_dir, "screenshots_with_grid"), metrics, cache=cache)
+    samples = [r["seconds"] for r in metrics.records if r["stage"] == "grid"]
+    stages["grid"] = _stage_result(measured, len(samples), "images/sec", samples)
+
+    return stages, image_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 픽스처 사이트 기반 파이프라인 벤치마크")
+    parser.add_argument("--browsers", default="chrome", help="쉼표로 구분한 브라우저 목록 (chrome, edge)")
+    parser.add_argument("--url-file", default=os.path.join(PROJECT_ROOT, "url.txt"))
+    parser.add_argument("--runs", type=int, default=1, help="반복 실행 횟수 (가장 빠른 실행을 저장)")
+    parser.add_argument("--keep", action="store_true", help="캡처 결과 폴더를 삭제하지 않음")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="두 결과 파일 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    browsers = [b.strip() for b in args.browsers.split(",") if b.strip()]
+    urls = get_urls_from_file(args.url_file)
+
+    runs = []
+    with FixtureServer() as server:
+        for i in range(args.runs):
+            work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+            try:
+                stages, image_count = run_pipeline(server.base_url, urls, browsers, work_dir)
+                runs.append({"stages": stages, "images": image_count})
+                print(f"[{i + 1}/{args.runs}] " + ", ".join(
+                    f"{name}: {s['throughput']:.2f} {s['unit']}" for name, s in stages.items() if s["throughput"]
+                ))
+            finally:
+                if args.keep:
+                    print(f"결과 폴더: {work_dir}")
+                else:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+
+    # 전체 소요 시간이 가장 짧은 실행을 대표값으로 저장
+    best = min(runs, key=lambda r: sum(s["seconds"] for s in r["stages"].values()))
+    save_result("pipeline", {
+        "config": {"browsers": browsers, "urls": len(urls), "breakpoints": DEFAULT_BREAKPOINTS, "runs": args.runs},
+        "stages": best["stages"],
+        "images": best["images"],
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+GUI 시작 시간을 측정합니다 (새 프로세스 기준).
+
+    cli_help      : `main.py --help` 실행부터 종료까지
+    first_window  : 프로세스 시작부터 App 창이 처음 그려질 때까지 (디스플레이가 없으면 건너뜀)
+    import_main   : `import main` 자체 소요 시간 (-X importtime 기준, 가장 무거운 모듈 목록 포함)
+
+사용 예:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 20
+    python -m benchmarks.bench_startup --exe dist/main/main
+    python -m benchmarks.bench_startup --compare results/old.json results/new.json
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import PROJECT_ROOT, compare_results, latency_summary, save_result
+
+# --- Configuration ---
+# 1. 첫 창 측정용 스크립트. 창을 한 번 그린 뒤 READY를 출력하고 종료
+FIRST_WINDOW_SCRIPT = """
+import tkinter as tk
+import main
+root = tk.Tk()
+app = main.App(root)
+root.update()
+print("READY", flush=True)
+root.destroy()
+"""
+
+# 2. 결과에 남길 가장 무거운 임포트 수
+TOP_IMPORTS = 10
+
+# 3. 측정 전에 버리는 실행 수 (디스크 캐시를 데우기 위함)
+WARMUP_RUNS = 1
+
+
+def time_cli_help(command):
+    started = time.perf_counter()
+    subprocess.run(command + ["--help"], cwd=PROJECT_ROOT, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def time_first_window():
+    """창이 그려질 때까지의 시간(초). 디스플레이가 없어 창을 만들 수 없으면 None."""
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", FIRST_WINDOW_SCRIPT], cwd=PROJECT_ROOT,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    elapsed = time.perf_counter() - started
+    _, stderr = proc.communicate()
+    if line.strip() != "READY":
+        print(f"첫 창 측정 불가 (디스플레이 없음?): {stderr.strip().splitlines()[-1:] or proc.returncode}")
+        return None
+    return elapsed
+
+
+def import_profile():
+    """-X importtime 결과에서 main 전체 소요 시간과 누적 시간이 큰 모듈을 반환합니다."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=PROJECT_ROOT,
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in out.splitlines():
+        # 형식: "import time: <self us> | <cumulative us> | <들여쓰기된 모듈 이름>"
+        fields = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(fields) != 3:
+            continue
+        cumulative_us, name = fields[1].strip(), fields[2].strip()
+        if cumulative_us.isdigit():
+            rows.append((int(cumulative_us), name))
+    total = next((us for us, name in rows if name == "main"), None)
+    heaviest = sorted((r for r in rows if r[1] != "main"), reverse=True)[:TOP_IMPORTS]
+    return total, [{"module": name, "cumulative_ms": us / 1000} for us, name in heaviest]
+
+
+def measure(label, func, runs):
+    for _ in range(WARMUP_RUNS):
+        if func() is None:
+            return None
+    samples = [func() for _ in range(runs)]
+    if any(s is None for s in samples):
+        return None
+    summary = latency_summary(samples)
+    print(f"{label:<14}p50 {summary['p50'] * 1000:.0f}ms  p90 {summary['p90'] * 1000:.0f}ms  max {summary['max'] * 1000:.0f}ms")
+    # compare_results에서 비교할 수 있도록 초당 실행 횟수를 throughput으로 저장
+    return {"latency": summary, "throughput": 1 / summary["p50"], "unit": "launches/s"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI 시작 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=10, help="측정 반복 횟수")
+    parser.add_argument("--exe", help="PyInstaller로 빌드한 실행 파일 (지정하면 cli_help를 이 파일로 측정)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="두 결과 파일 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+
+    command = [os.path.abspath(args.exe)] if args.exe else [sys.executable, "main.py"]
+    stages = {"cli_help": measure("cli_help", lambda: time_cli_help(command), args.runs)}
+    first_window = measure("first_window", time_first_window, args.runs)
+    if first_window:
+        stages["first_window"] = first_window
+
+    total_us, heaviest = import_profile()
+    if total_us is not None:
+        print(f"{'import_main':<14}{total_us / 1000:.0f}ms")
+        for item in heaviest:
+            print(f"    {item['cumulative_ms']:>8.1f}ms  {item['module']}")
+
+    save_result("startup", {
+        "config": {"runs": args.runs, "exe": args.exe},
+        "stages": stages,
+        "import_main_ms": total_us / 1000 if total_us is not None else None,
+        "heaviest_imports": heaviest,
+    })
+
+
+if __name__ == "__main__":
+    main()
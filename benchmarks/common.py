@@ -0,0 +1,198 @@
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# 벤치마크 결과 저장 폴더 (커밋별 비교용)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 단계별 RSS 샘플링 간격 (초)
+RSS_SAMPLE_INTERVAL = 0.02
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from metrics import get_peak_rss_bytes
+
+
+def percentile(values, pct):
+    """정렬된 값에서 선형 보간으로 백분위수를 계산합니다."""
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def latency_summary(samples):
+    return {
+        "count": len(samples),
+        "p50": percentile(samples, 50),
+        "p90": percentile(samples, 90),
+        "p99": percentile(samples, 99),
+        "max": max(samples) if samples else None,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _tree_rss(psutil, roots):
+    """프로세스들과 그 하위 프로세스 전체의 RSS 합계."""
+    total = 0
+    for root in roots:
+        try:
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            continue
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+    return total
+
+
+class RssSampler:
+    """
+    블록 실행 중 RSS를 주기적으로 샘플링하여 단계별 최대치를 구합니다.
+    현재 프로세스와 browser_pids(예: chromedriver, 하위의 브라우저 프로세스 포함)를 따로 집계합니다.
+    psutil이 없으면 None을 보고합니다.
+    """
+
+    def __init__(self, browser_pids=None, interval=RSS_SAMPLE_INTERVAL):
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+        self._psutil = psutil
+        self._browser_pids = browser_pids or []
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.peak_rss = None
+        self.peak_browser_rss = None
+
+    def _sample(self):
+        own = self._psutil.Process().memory_info().rss
+        self.peak_rss = max(self.peak_rss or 0, own)
+        if self._browser_pids:
+            roots = []
+            for pid in self._browser_pids:
+                try:
+                    roots.append(self._psutil.Process(pid))
+                except self._psutil.Error:
+                    pass
+            self.peak_browser_rss = max(self.peak_browser_rss or 0, _tree_rss(self._psutil, roots))
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self._sample()
+
+    def __enter__(self):
+        if self._psutil is not None:
+            self._sample()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+
+
+@contextmanager
+def measure_stage(browser_pids=None):
+    """
+    블록의 소요 시간, Python 힙 최대 사용량(tracemalloc), 블록 동안의 최대 RSS를 측정합니다.
+    browser_pids를 넘기면 해당 프로세스 트리(브라우저)의 최대 RSS도 함께 측정합니다.
+    yield된 딕셔너리에 결과가 채워집니다.
+    """
+    result = {}
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    sampler = RssSampler(browser_pids)
+    start = time.perf_counter()
+    try:
+        with sampler:
+            yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+        result["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        result["peak_rss_bytes"] = sampler.peak_rss
+        if browser_pids:
+            result["peak_browser_rss_bytes"] = sampler.peak_browser_rss
+        # 프로세스 시작 이후 최대치 (단계별 값이 아님, psutil이 없을 때 참고용)
+        result["process_max_rss_bytes"] = get_peak_rss_bytes()
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def save_result(suite, result, results_dir=RESULTS_DIR):
+    """결과를 results/<suite>_<시각>_<커밋>.json 으로 저장하고 경로를 반환합니다."""
+    commit = git_commit()
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    result = {
+        "suite": suite,
+        "commit": commit,
+        "timestamp": timestamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **result,
+    }
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{suite}_{timestamp}_{commit}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"결과 저장: {path}")
+    return path
+
+
+def compare_results(old_path, new_path):
+    """두 결과 파일의 단계별 처리량과 p50 지연 시간을 비교해 출력합니다."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"{old['commit']} -> {new['commit']}")
+    print(f"{'stage':<28}{'throughput':>24}{'p50 (s)':>24}")
+    for name, new_stage in new.get("stages", {}).items():
+        old_stage = old.get("stages", {}).get(name)
+        if not old_stage:
+            print(f"{name:<28}{'(new)':>24}")
+            continue
+        print(
+            f"{name:<28}"
+            f"{_format_delta(old_stage.get('throughput'), new_stage.get('throughput')):>24}"
+            f"{_format_delta(old_stage.get('latency', {}).get('p50'), new_stage.get('latency', {}).get('p50')):>24}"
+        )
+
+
+def _format_delta(old, new):
+    if old is None or new is None:
+        return "-"
+    if not old:
+        return f"{old:.3g} -> {new:.3g}"
+    return f"{old:.3g} -> {new:.3g} ({(new - old) / old * 100:+.1f}%)"
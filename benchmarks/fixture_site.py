@@ -0,0 +1,148 @@
+import html
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.common import PROJECT_ROOT  # noqa: F401 (sys.path 설정)
+from config import LOGIN_ID_FIELD_ID, LOGIN_PW_FIELD_ID
+
+# --- Configuration ---
+# 게시판 목록 페이지의 행 수
+BOARD_ROWS = 40
+
+# 강의 페이지의 카드 수
+LECTURE_CARDS = 24
+
+# 모든 페이지에 공통으로 들어가는 반응형 스타일 (config.py의 Breakpoint와 동일한 경계)
+BASE_CSS = """
+* { box-sizing: border-box; }
+body { margin: 0; font-family: sans-serif; color: #222; }
+header { display: flex; justify-content: space-between; padding: 16px 24px; background: #1d3557; color: #fff; }
+nav a { color: #fff; margin-left: 16px; text-decoration: none; }
+main { max-width: 1280px; margin: 0 auto; padding: 24px; }
+table { width: 100%; border-collapse: collapse; }
+td, th { border-bottom: 1px solid #ddd; padding: 8px; text-align: left; }
+.cards { display: grid; grid-template-columns: repeat(4, 1fr); gap: 24px; }
+.card { border: 1px solid #ccc; border-radius: 8px; overflow: hidden; }
+.card .thumb { height: 140px; }
+.card p { padding: 0 12px; }
+footer { padding: 32px 24px; background: #f1faee; }
+@media (max-width: 1279px) { .cards { grid-template-columns: repeat(3, 1fr); } }
+@media (max-width: 1023px) { .cards { grid-template-columns: repeat(2, 1fr); } nav { display: none; } }
+@media (max-width: 767px) { .cards { grid-template-columns: 1fr; } td.date { display: none; } }
+"""
+
+LOREM = (
+    "강의 소개 수강 신청 안내 공지사항 자료실 질문 답변 학습 진도 수료 기준 "
+    "온라인 교육 과정 운영 일정 평가 방법 출석 인정 기준"
+).split()
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(LOREM) for _ in range(words))
+
+
+def _layout(title, body):
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)}</title><style>{BASE_CSS}</style></head>
+<body>
+<header><strong>Fixture LMS</strong><nav><a href="/">홈</a><a href="/info_edu/open_content">공개 강의</a><a href="/my/find">마이페이지</a></nav></header>
+<main>{body}</main>
+<footer>{html.escape(title)} · benchmark fixture</footer>
+</body></html>"""
+
+
+def render_login_page():
+    return _layout("로그인", f"""
+<h1>로그인</h1>
+<form method="post" action="/login">
+  <p><label>아이디 <input type="text" id="{LOGIN_ID_FIELD_ID}" name="{LOGIN_ID_FIELD_ID}"></label></p>
+  <p><label>비밀번호 <input type="password" id="{LOGIN_PW_FIELD_ID}" name="{LOGIN_PW_FIELD_ID}"></label></p>
+  <p><button type="submit">로그인</button></p>
+</form>""")
+
+
+def render_board_page(path, query):
+    # 경로와 쿼리로 시드를 정해 매 실행마다 동일한 페이지를 생성
+    rng = random.Random(f"{path}?{query}")
+    rows = "".join(
+        f"<tr><td>{BOARD_ROWS - i}</td><td>{html.escape(_sentence(rng, 6))}</td>"
+        f"<td>관리자</td><td class=\"date\">2024-0{rng.randint(1, 9)}-{rng.randint(10, 28)}</td></tr>"
+        for i in range(BOARD_ROWS)
+    )
+    return _layout(path, f"""
+<h1>{html.escape(path)}</h1>
+<table><thead><tr><th>번호</th><th>제목</th><th>작성자</th><th class="date">날짜</th></tr></thead>
+<tbody>{rows}</tbody></table>""")
+
+
+def render_lecture_page(path, query):
+    rng = random.Random(f"{path}?{query}")
+    cards = "".join(
+        f"<div class=\"card\"><div class=\"thumb\" style=\"background: hsl({rng.randint(0, 359)}, 60%, 70%)\"></div>"
+        f"<h3>&nbsp;{html.escape(_sentence(rng, 3))}</h3><p>{html.escape(_sentence(rng, 18))}</p></div>"
+        for _ in range(LECTURE_CARDS)
+    )
+    return _layout(path, f"""
+<h1>{html.escape(path)}</h1>
+<p>{html.escape(_sentence(rng, 40))}</p>
+<div class="cards">{cards}</div>""")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == "/login":
+            body = render_login_page()
+        elif parsed.path.startswith("/info_edu/"):
+            body = render_lecture_page(parsed.path, parsed.query)
+        else:
+            body = render_board_page(parsed.path, parsed.query)
+        self._send_html(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if urlparse(self.path).path == "/login" and form.get(LOGIN_ID_FIELD_ID) and form.get(LOGIN_PW_FIELD_ID):
+            # 로그인 성공 시 루트로 이동 (autologin.login의 성공 조건)
+            self.send_response(302)
+            self.send_header("Location", "/")
+            self.end_headers()
+        else:
+            self._send_html(render_login_page(), status=401)
+
+    def _send_html(self, body, status=200):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # 벤치마크 출력이 요청 로그로 덮이지 않도록 비활성화
+        pass
+
+
+class FixtureServer:
+    """로컬호스트의 임의 포트에서 픽스처 사이트를 백그라운드로 서비스합니다."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), FixtureHandler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+# --- Configuration ---
+# 1. 체크포인트 저널 파일 이름 (저장 경로 아래, 브라우저별로 하나씩)
+JOURNAL_FILE_NAME = ".capture_journal_{browser}.jsonl"
+
+# 2. 이어서 캡처할 수 있는 저널의 최대 나이 (초). 더 오래된 저널의 스크린샷은 재사용하지 않음
+JOURNAL_MAX_AGE = 12 * 60 * 60
+
+# 3. 사용하지 않기로 한 저널을 옮겨 둘 파일 이름 접미사 (삭제하지 않고 한 개만 보관)
+STALE_JOURNAL_SUFFIX = ".stale"
+
+
+def get_journal_path(base_path, browser_type):
+    return os.path.join(base_path, JOURNAL_FILE_NAME.format(browser=browser_type))
+
+
+def capture_settings(browser, base_url, breakpoints, deterministic=False, network_cache=False):
+    """
+    저널에 해시로 기록할 캡처 설정. GUI와 분산 코디네이터가 같은 저널을 이어서 쓸 수 있도록 여기서만 정의합니다.
+    base_url은 로그인 URL이 아닌 끝의 '/'를 뺀 기본 URL입니다.
+    """
+    return {
+        "browser": browser,
+        "base_url": base_url.rstrip('/') if base_url else base_url,
+        "breakpoints": breakpoints,
+        "deterministic": bool(deterministic),
+        "network_cache": bool(network_cache),
+    }
+
+
+def settings_hash(settings):
+    """캡처 결과에 영향을 주는 설정(기본 URL, Breakpoint, 렌더링 옵션 등)의 해시."""
+    data = json.dumps(settings, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def read_journal_header(path):
+    """저널 첫 줄의 실행 정보({"type": "run", "started", "settings"})를 반환합니다. 없으면 None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    return header if isinstance(header, dict) and header.get("type") == "run" else None
+
+
+def journal_stale_reason(path, settings=None, max_age=JOURNAL_MAX_AGE):
+    """
+    저널을 이어서 사용할 수 없는 이유를 반환합니다. 사용할 수 있거나 저널이 없으면 None.
+    "legacy": 실행 정보가 없는 이전 형식 / "settings": 설정이 다름 / "age": max_age보다 오래됨
+    """
+    if not os.path.exists(path):
+        return None
+    header = read_journal_header(path)
+    if header is None:
+        return "legacy"
+    if settings is not None and header.get("settings") != settings_hash(settings):
+        return "settings"
+    if max_age is not None and time.time() - header.get("started", 0) > max_age:
+        return "age"
+    return None
+
+
+class CaptureJournal:
+    """
+    (URL, Breakpoint) 단위 캡처 결과를 JSON Lines로 기록하는 체크포인트 저널입니다.
+    브라우저가 중간에 종료되어도 다시 실행하면 완료되지 않은 항목만 캡처합니다.
+    첫 줄에는 실행 시작 시각과 설정 해시를 기록하며, 설정이 다르거나 max_age보다 오래된 저널은
+    STALE_JOURNAL_SUFFIX를 붙여 옮겨 두고 처음부터 캡처합니다 (max_age=None이면 나이는 확인하지 않음).
+    """
+
+    def __init__(self, path, settings=None, max_age=JOURNAL_MAX_AGE):
+        self.path = path
+        self.settings = settings_hash(settings) if settings is not None else None
+        self._lock = threading.Lock()
+        # (url, width) -> 마지막 기록
+        self.entries = {}
+        self._load(settings, max_age)
+
+    def _load(self, settings, max_age):
+        if not os.path.exists(self.path):
+            return
+        reason = journal_stale_reason(self.path, settings, max_age)
+        if reason:
+            logging.warning(f"이전 체크포인트를 사용하지 않고 처음부터 캡처합니다 ({reason}): {self.path}")
+            os.replace(self.path, self.path + STALE_JOURNAL_SUFFIX)
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 도중 종료되어 잘린 마지막 줄은 무시
+                    continue
+                if entry.get("type") == "run":
+                    continue
+                self.entries[(entry["url"], entry["width"])] = entry
+        done = sum(1 for e in self.entries.values() if e["status"] == "done")
+        logging.info(f"체크포인트 불러오기: {self.path} (완료 {done}건)")
+
+    def _append(self, entry):
+        with self._lock:
+            self.entries[(entry["url"], entry["width"])] = entry
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            new_file = not os.path.exists(self.path)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if new_file:
+                    header = {"type": "run", "started": time.time(), "settings": self.settings}
+                    f.write(json.dumps(header) + "\n")
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def is_done(self, url, width):
+        entry = self.entries.get((url, width))
+        # 저널에는 완료로 남아 있지만 파일이 삭제된 경우 다시 캡처
+        return bool(entry) and entry["status"] == "done" and os.path.exists(entry["path"])
+
+    def mark_done(self, url, width, size_name, path):
+        self._append({"url": url, "width": width, "breakpoint": size_name, "status": "done", "path": path, "ts": time.time()})
+
+    def mark_failed(self, url, width, size_name, error):
+        self._append({"url": url, "width": width, "breakpoint": size_name, "status": "failed", "error": str(error), "ts": time.time()})
+
+    def is_complete(self, urls, widths):
+        return all(self.is_done(url, width) for url in urls for width in widths)
+
+    def clear(self):
+        """모든 항목이 완료되면 저널을 삭제하여 다음 실행이 처음부터 캡처하도록 합니다."""
+        with self._lock:
+            self.entries = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -1,7 +1,12 @@
 import os
 import logging
+import time
 import numpy as np
-from PIL import Image, ImageChops
+from PIL import Image
+
+from metrics import track
+from pixel_cache import load_rgb
+from progress import emit, is_cancelled
 
 # --- Configuration ---
 # 1. 픽셀 값 차이 임계값 (0-255)
@@ -16,44 +21,66 @@ SIGNIFICANT_PIXEL_COUNT_THRESHOLD = 100
 # 3. 차이점 표시 색상
 DIFF_COLOR = (255, 0, 0) # 밝은 빨강
 
+# 4. 한 번에 처리할 행 수 (긴 페이지에서 중간 배열의 메모리 사용량을 제한)
+DIFF_CHUNK_ROWS = 1024
+
 # --- Core Functions ---
 
-def compare_images(file1, file2, diff_output_path):
+def significant_diff_mask(arr1, arr2):
+    """
+    두 RGB 배열의 차이를 그레이스케일(PIL 'L' 변환과 같은 가중치)로 바꾼 뒤
+    PIXEL_DIFF_THRESHOLD를 넘는 픽셀을 True로 표시한 마스크를 반환합니다.
+    """
+    h = arr1.shape[0]
+    mask = np.empty(arr1.shape[:2], dtype=bool)
+    for top in range(0, h, DIFF_CHUNK_ROWS):
+        a = arr1[top:top + DIFF_CHUNK_ROWS]
+        b = arr2[top:top + DIFF_CHUNK_ROWS]
+        # 1. 두 이미지의 절대적인 차이를 계산 (uint8 범위 안에서)
+        diff = np.maximum(a, b) - np.minimum(a, b)
+        # 2. L = (R*19595 + G*38470 + B*7471 + 0x8000) >> 16 (Pillow RGB->L 변환식)
+        diff = diff.astype(np.uint32)
+        luma = (diff[..., 0] * 19595 + diff[..., 1] * 38470 + diff[..., 2] * 7471 + 0x8000) >> 16
+        mask[top:top + DIFF_CHUNK_ROWS] = luma > PIXEL_DIFF_THRESHOLD
+    return mask
+
+def compare_images(file1, file2, diff_output_path, metrics=None, labels=None, cache=None):
     """
     두 이미지를 비교하여 '의미 있는' 차이가 있을 경우, 
     차이점을 빨간색으로 칠한 diff 이미지를 저장합니다.
+    디코딩된 픽셀은 pixel_cache를 통해 공유되므로 같은 PNG는 한 번만 디코딩됩니다.
     """
+    labels = labels or {"file": os.path.basename(file1)}
     try:
-        img1 = Image.open(file1).convert('RGB')
-        img2 = Image.open(file2).convert('RGB')
-
-        if img1.size != img2.size:
-            logging.warning(f"이미지 크기 다름: {os.path.basename(file1)} {img1.size} vs {os.path.basename(file2)} {img2.size}. 작은 크기로 잘라내어 비교합니다.")
-            w = min(img1.width, img2.width)
-            h = min(img1.height, img2.height)
-            img1 = img1.crop((0, 0, w, h))
-            img2 = img2.crop((0, 0, w, h))
+        with track(metrics, "diff_decode", **labels):
+            arr1 = load_rgb(file1, cache)
+            arr2 = load_rgb(file2, cache)
 
-        # 1. 두 이미지의 절대적인 차이를 계산
-        diff = ImageChops.difference(img1, img2)
+        if arr1.shape != arr2.shape:
+            logging.warning(f"이미지 크기 다름: {os.path.basename(file1)} {arr1.shape[1::-1]} vs {os.path.basename(file2)} {arr2.shape[1::-1]}. 작은 크기로 잘라내어 비교합니다.")
+            w = min(arr1.shape[1], arr2.shape[1])
+            h = min(arr1.shape[0], arr2.shape[0])
+            arr1 = arr1[:h, :w]
+            arr2 = arr2[:h, :w]
 
-        # 2. '의미 있는' 차이만 남기는 마스크 생성
-        fn = lambda x: 255 if x > PIXEL_DIFF_THRESHOLD else 0
-        mask = diff.convert('L').point(fn, mode='1')
+        with track(metrics, "diff", **labels):
+            mask = significant_diff_mask(arr1, arr2)
 
-        # 3. '의미 있는' 차이를 가진 픽셀의 개수 계산
-        num_significant_diffs = np.sum(np.array(mask)) / 255 # 마스크는 0 또는 255 값을 가지므로 255로 나눔
+            # 3. '의미 있는' 차이를 가진 픽셀의 개수 계산
+            # (기존 mode '1' 마스크 합계를 255로 나누던 기준을 그대로 유지)
+            num_significant_diffs = np.count_nonzero(mask) / 255
 
         # 4. 다른 픽셀의 개수가 임계값을 초과하는 경우에만 '다르다'고 판단
         if num_significant_diffs > SIGNIFICANT_PIXEL_COUNT_THRESHOLD:
             logging.info(f"차이점 발견 (다른 픽셀 수: {int(num_significant_diffs)} > {SIGNIFICANT_PIXEL_COUNT_THRESHOLD}): {os.path.basename(file1)}")
 
             # 5. 차이점을 빨간색으로 칠하기
-            diff_highlight = img2.copy()
-            red_img = Image.new('RGB', img2.size, DIFF_COLOR)
-            diff_highlight.paste(red_img, mask=mask)
+            diff_highlight = np.array(arr2)
+            diff_highlight[mask] = DIFF_COLOR
 
-            diff_highlight.save(diff_output_path)
+            with track(metrics, "diff_write", **labels) as rec:
+                Image.fromarray(diff_highlight).save(diff_output_path)
+                rec["bytes"] = os.path.getsize(diff_output_path)
             logging.info(f"Diff 이미지 저장: {diff_output_path}")
             return True
 
@@ -66,9 +93,12 @@ def compare_images(file1, file2, diff_output_path):
         logging.error(f"이미지 비교 중 오류 발생: {e}")
         return True
 
-def run_comparison(base_path, output_dir_name="comparison_results"):
+def run_comparison(base_path, output_dir_name="comparison_results", metrics=None, progress=None, cancel=None,
+                   cache=None):
     """
     base_path에서 Chrome과 Edge의 스크린샷을 찾아 비교합니다.
+    progress(ProgressBus)에는 이미지 쌍마다 이벤트를 보내고, cancel(CancelToken)이 설정되면 다음 쌍 전에 멈춥니다.
+    cache(PixelCache)를 넘기면 디코딩한 픽셀을 그리드 적용과 공유합니다.
     """
     logging.info(f"스크린샷 비교 시작: {base_path}")
 
@@ -91,14 +121,13 @@ def run_comparison(base_path, output_dir_name="comparison_results"):
                 logging.warning(f"폴더 이름 형식이 올바르지 않아 건너뜁니다: {d}")
 
 
-    diff_count = 0
+    # 진행률 계산을 위해 비교할 이미지 쌍을 먼저 모음
+    pairs = []
     for breakpoint_key, browsers in grouped_dirs.items():
         if 'chrome' in browsers and 'edge' in browsers:
             chrome_dir = browsers['chrome']
             edge_dir = browsers['edge']
 
-            logging.info(f"Breakpoint 비교 중: {breakpoint_key}")
-
             breakpoint_output_path = os.path.join(output_path, breakpoint_key)
             if not os.path.exists(breakpoint_output_path):
                 os.makedirs(breakpoint_output_path)
@@ -111,13 +140,29 @@ def run_comparison(base_path, output_dir_name="comparison_results"):
                     if os.path.exists(edge_img_path):
                         diff_img_name = f"{os.path.splitext(img_name)[0]}_diff.png"
                         diff_output_path = os.path.join(breakpoint_output_path, diff_img_name)
-
-                        if compare_images(chrome_img_path, edge_img_path, diff_output_path):
-                            diff_count += 1
+                        pairs.append((breakpoint_key, img_name, chrome_img_path, edge_img_path, diff_output_path))
                     else:
                         logging.warning(f"Edge 폴더에 해당 이미지가 없습니다: {img_name}")
         else:
             logging.warning(f"'{breakpoint_key}' Breakpoint에 비교할 브라우저 쌍이 없습니다.")
 
+    emit(progress, "start", "compare", total=len(pairs))
+    diff_count = 0
+    current_key = None
+    for breakpoint_key, img_name, chrome_img_path, edge_img_path, diff_output_path in pairs:
+        if is_cancelled(cancel):
+            logging.info("스크린샷 비교가 취소되었습니다.")
+            break
+        if breakpoint_key != current_key:
+            logging.info(f"Breakpoint 비교 중: {breakpoint_key}")
+            current_key = breakpoint_key
+
+        started = time.perf_counter()
+        labels = {"breakpoint": breakpoint_key, "file": img_name}
+        if compare_images(chrome_img_path, edge_img_path, diff_output_path, metrics, labels, cache):
+            diff_count += 1
+        emit(progress, "item", "compare", bytes=os.path.getsize(chrome_img_path) + os.path.getsize(edge_img_path),
+             duration=time.perf_counter() - started, label=f"{breakpoint_key}/{img_name}")
+
     logging.info(f"비교 완료. 총 {diff_count}개의 차이점을 발견했습니다.")
     return diff_count, output_path
@@ -0,0 +1,526 @@
+"""
+여러 PC(또는 여러 프로세스)에서 스크린샷 캡처를 나누어 실행하는 코디네이터/워커 모드입니다.
+
+코디네이터는 (URL x Breakpoint x 브라우저) 작업을 샤드로 나누어 대기열에 넣고,
+워커는 TCP로 접속하여 샤드를 하나씩 가져가 캡처한 PNG를 돌려보냅니다.
+결과는 코디네이터의 저장 경로에 기존 캡처와 같은 폴더 구조로 저장되므로
+run_comparison과 process_screenshots를 그대로 사용할 수 있습니다.
+
+사용 예:
+    python distributed.py coordinator --base-url https://example.com/ --save-path out --port 8765
+    python distributed.py worker --coordinator 192.168.0.10:8765 --browsers chrome
+    python distributed.py local --base-url https://example.com/ --save-path out --workers 3
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from checkpoint import CaptureJournal, capture_settings, get_journal_path
+from config import DEFAULT_BREAKPOINTS, get_sorted_breakpoints
+
+# --- Configuration ---
+# 1. 샤드 하나에 담을 URL 수 (같은 URL의 Breakpoint는 한 샤드에 묶어 페이지 이동을 한 번만 함)
+DEFAULT_SHARD_URLS = 2
+
+# 2. 작업 실패 시 다시 대기열에 넣는 최대 횟수
+MAX_ATTEMPTS = 3
+
+# 3. 대기열이 비었을 때, 이 시간(초) 이상 끝나지 않은 작업은 다른 워커에게도 중복 배정 (느린 페이지 대비)
+SPECULATE_AFTER = 60
+
+# 4. 받을 작업이 없을 때 워커가 다시 요청하기까지 기다리는 시간 (초)
+WORKER_POLL_INTERVAL = 1.0
+
+# 5. 연결된 워커가 하나도 없는 상태로 이 시간(초)이 지나면 남은 작업이 있어도 코디네이터를 종료
+NO_WORKER_TIMEOUT = 300
+
+DEFAULT_PORT = 8765
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+class LoginFailedError(RuntimeError):
+    """워커가 로그인하지 못한 경우. 다른 작업도 모두 실패하므로 워커를 종료합니다."""
+
+
+def send_message(wfile, message):
+    wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+def receive_message(rfile):
+    line = rfile.readline()
+    if not line:
+        raise ConnectionError("연결이 종료되었습니다.")
+    return json.loads(line)
+
+
+class Coordinator:
+    """작업 대기열과 결과를 관리합니다. 모든 메서드는 여러 워커 스레드에서 호출됩니다."""
+
+    def __init__(self, urls, base_path, browsers, breakpoints, login_url=None, shard_urls=DEFAULT_SHARD_URLS,
+                 deterministic=False, token=None, base_url=None):
+        self.base_path = base_path
+        self.login_url = login_url
+        self.deterministic = deterministic
+        self.token = token
+        self._lock = threading.Lock()
+        self.finished = threading.Event()
+        # 접속 중인 워커 수와 마지막으로 워커가 연결되어 있던 시각 (워커가 모두 끊기면 코디네이터 종료)
+        self.connected = {}
+        self.last_connected = time.time()
+
+        # 이전 실행의 체크포인트 저널이 있으면 완료된 작업은 건너뜀
+        # (설정이 다르거나 오래된 저널은 CaptureJournal이 무시함. 워커는 리소스 캐시를 사용하지 않음)
+        self.journals = {
+            b: CaptureJournal(get_journal_path(base_path, b),
+                              capture_settings(b, base_url, breakpoints, deterministic, network_cache=False))
+            for b in browsers
+        }
+        self.tasks = {}
+        self.queue = []  # 대기 중인 샤드 (작업 ID 리스트)
+        sorted_breakpoints = get_sorted_breakpoints(breakpoints)
+        for browser in browsers:
+            for i in range(0, len(urls), shard_urls):
+                shard = []
+                for url in urls[i:i + shard_urls]:
+                    for width, size_name in sorted_breakpoints:
+                        if self.journals[browser].is_done(url, width):
+                            continue
+                        task_id = len(self.tasks)
+                        self.tasks[task_id] = {
+                            "task_id": task_id, "url": url, "browser": browser, "width": width,
+                            "size_name": size_name, "status": "pending", "owners": [], "attempts": 0,
+                        }
+                        shard.append(task_id)
+                if shard:
+                    self.queue.append(shard)
+        # 워커별로 배정되었지만 다른 워커에게 넘어간 작업 (다음 응답에서 알려줌)
+        self.revoked = {}
+        self.started = {}
+        if not self.tasks:
+            self.finished.set()
+        logging.info(f"분산 캡처 작업 {len(self.tasks)}개, 샤드 {len(self.queue)}개 생성")
+
+    def _client_task(self, task_id):
+        task = self.tasks[task_id]
+        return {k: task[k] for k in ("task_id", "url", "browser", "width", "size_name")}
+
+    def next_shard(self, worker, browsers):
+        with self._lock:
+            if self.finished.is_set():
+                return {"type": "done"}
+
+            for i, shard in enumerate(self.queue):
+                if self.tasks[shard[0]]["browser"] in browsers:
+                    self.queue.pop(i)
+                    return self._assign(worker, shard)
+
+            stolen = self._steal(worker, browsers)
+            if stolen:
+                return self._assign(worker, stolen)
+            return {"type": "wait"}
+
+    def _assign(self, worker, task_ids):
+        now = time.time()
+        for task_id in task_ids:
+            task = self.tasks[task_id]
+            task["status"] = "running"
+            task["owners"].append(worker)
+            self.started[task_id] = now
+        return {"type": "shard", "tasks": [self._client_task(t) for t in task_ids]}
+
+    def _steal(self, worker, browsers):
+        """
+        대기열이 비었을 때 다른 워커가 아직 시작하지 못한 작업을 가져옵니다.
+        가장 많이 남은 워커의 작업 절반을 넘겨받고, 남은 작업이 하나뿐이면
+        오래 걸리는 작업만 중복 배정합니다 (먼저 도착한 결과 사용).
+        """
+        running = {}
+        for task in self.tasks.values():
+            if task["status"] == "running" and task["browser"] in browsers and worker not in task["owners"]:
+                running.setdefault(task["owners"][-1], []).append(task["task_id"])
+        if not running:
+            return None
+
+        victim, task_ids = max(running.items(), key=lambda item: len(item[1]))
+        if len(task_ids) >= 2:
+            # 뒤쪽 절반은 원래 워커가 아직 시작하지 않았을 가능성이 높음
+            stolen = task_ids[len(task_ids) // 2:]
+            self.revoked.setdefault(victim, set()).update(stolen)
+            logging.info(f"작업 가로채기: {victim} -> {worker} ({len(stolen)}개)")
+            return stolen
+
+        task_id = task_ids[0]
+        if time.time() - self.started[task_id] > SPECULATE_AFTER and len(self.tasks[task_id]["owners"]) < 2:
+            logging.info(f"느린 작업 중복 배정: {self.tasks[task_id]['url']} -> {worker}")
+            return [task_id]
+        return None
+
+    def report(self, worker, message):
+        """워커의 작업 결과를 저장하고, 해당 워커가 건너뛸 작업 ID 목록을 반환합니다."""
+        with self._lock:
+            task = self.tasks.get(message["task_id"])
+            if task is None or task["status"] == "done":
+                # 중복 배정된 작업의 늦은 결과는 버림
+                return sorted(self.revoked.pop(worker, set()))
+
+            if message["ok"]:
+                path = self._save(task, base64.b64decode(message["png"]))
+                task.update(status="done", path=path, worker=worker, duration=message.get("duration"))
+            else:
+                task["attempts"] += 1
+                task["error"] = message.get("error")
+                logging.warning(f"작업 실패 ({worker}): {task['url']} {task['width']} - {task['error']}")
+                if task["attempts"] >= MAX_ATTEMPTS:
+                    task["status"] = "failed"
+                    self.journals[task["browser"]].mark_failed(task["url"], task["width"], task["size_name"], task["error"])
+                elif task["owners"][-1] == worker:
+                    task["status"] = "pending"
+                    self.queue.append([task["task_id"]])
+
+            if all(t["status"] in ("done", "failed") for t in self.tasks.values()):
+                self.finished.set()
+            return sorted(self.revoked.pop(worker, set()))
+
+    def connect(self, worker):
+        with self._lock:
+            self.connected[worker] = self.connected.get(worker, 0) + 1
+
+    def idle_time(self):
+        """연결된 워커가 없던 시간(초). 워커가 연결되어 있으면 0."""
+        with self._lock:
+            if self.connected:
+                self.last_connected = time.time()
+                return 0
+            return time.time() - self.last_connected
+
+    def release(self, worker):
+        """연결이 끊긴 워커가 끝내지 못한 작업을 다시 대기열에 넣습니다."""
+        with self._lock:
+            if self.connected.get(worker, 0) > 1:
+                self.connected[worker] -= 1
+            elif self.connected.pop(worker, None):
+                self.last_connected = time.time()
+            orphaned = [t["task_id"] for t in self.tasks.values()
+                        if t["status"] == "running" and t["owners"][-1] == worker]
+            shards = {}
+            for task_id in orphaned:
+                self.tasks[task_id]["status"] = "pending"
+                shards.setdefault(self.tasks[task_id]["browser"], []).append(task_id)
+            # 샤드는 브라우저별로 구성 (next_shard가 첫 작업의 브라우저로 배정 여부를 판단)
+            self.queue.extend(shards.values())
+            if orphaned:
+                logging.warning(f"워커 연결 끊김: {worker}의 작업 {len(orphaned)}개를 다시 대기열에 넣습니다.")
+            self.revoked.pop(worker, None)
+
+    def _save(self, task, png_bytes):
+        from screenshot import get_page_title
+
+        directory = os.path.join(self.base_path, f"{task['browser']}_{task['width']} - {task['size_name']}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{get_page_title(task['url'])}.png")
+        with open(path, "wb") as f:
+            f.write(png_bytes)
+        self.journals[task["browser"]].mark_done(task["url"], task["width"], task["size_name"], path)
+        logging.info(f"스크린샷 저장: {path}")
+        return path
+
+    def write_manifest(self):
+        """모든 작업 결과를 저장 경로의 manifest.json에 기록합니다. 이전 manifest 항목과 병합합니다."""
+        manifest_path = os.path.join(self.base_path, MANIFEST_FILE_NAME)
+        entries = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                for entry in json.load(f).get("tasks", []):
+                    entries[(entry["url"], entry["browser"], entry["width"])] = entry
+        for task in self.tasks.values():
+            entries[(task["url"], task["browser"], task["width"])] = {
+                k: task.get(k) for k in ("url", "browser", "width", "size_name", "status", "path", "worker",
+                                         "duration", "attempts", "error")
+            }
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"generated": time.time(), "tasks": list(entries.values())}, f, indent=2, ensure_ascii=False)
+        logging.info(f"manifest 저장: {manifest_path}")
+        return manifest_path
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        worker = f"{self.client_address[0]}:{self.client_address[1]}"
+        try:
+            hello = receive_message(self.rfile)
+            if coordinator.token and hello.get("token") != coordinator.token:
+                send_message(self.wfile, {"type": "error", "error": "토큰이 일치하지 않습니다."})
+                return
+            worker = hello.get("worker") or worker
+            browsers = hello.get("browsers", [])
+            send_message(self.wfile, {
+                "type": "config", "login_url": coordinator.login_url, "deterministic": coordinator.deterministic,
+            })
+            coordinator.connect(worker)
+            logging.info(f"워커 접속: {worker} ({', '.join(browsers)})")
+            while True:
+                message = receive_message(self.rfile)
+                if message["type"] == "get_shard":
+                    send_message(self.wfile, coordinator.next_shard(worker, browsers))
+                elif message["type"] == "result":
+                    send_message(self.wfile, {"type": "ack", "revoked": coordinator.report(worker, message)})
+        except (ConnectionError, OSError, ValueError) as e:
+            logging.info(f"워커 연결 종료: {worker} ({e})")
+        finally:
+            coordinator.release(worker)
+
+
+class CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, coordinator, host="0.0.0.0", port=DEFAULT_PORT):
+        super().__init__((host, port), _CoordinatorHandler)
+        self.coordinator = coordinator
+
+    def run(self):
+        """
+        모든 작업이 끝날 때까지 워커 요청을 처리한 뒤 manifest를 기록합니다.
+        연결된 워커 없이 NO_WORKER_TIMEOUT초가 지나면 남은 작업을 그대로 manifest에 기록하고
+        RuntimeError를 발생시킵니다 (완료된 항목은 저널에 남아 다음 실행에서 이어서 캡처).
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        logging.info(f"코디네이터 대기 중: {self.server_address[0]}:{self.server_address[1]}")
+        try:
+            while not self.coordinator.finished.wait(WORKER_POLL_INTERVAL):
+                if self.coordinator.idle_time() > NO_WORKER_TIMEOUT:
+                    logging.error(f"연결된 워커가 {NO_WORKER_TIMEOUT}초 동안 없어 분산 캡처를 중단합니다.")
+                    break
+            else:
+                # 워커가 'done' 응답을 받을 시간을 잠시 줌
+                time.sleep(WORKER_POLL_INTERVAL * 2)
+        finally:
+            self.shutdown()
+            self.server_close()
+        manifest_path = self.coordinator.write_manifest()
+        if not self.coordinator.finished.is_set():
+            pending = sum(1 for t in self.coordinator.tasks.values() if t["status"] not in ("done", "failed"))
+            raise RuntimeError(f"워커 없이 중단됨: 남은 작업 {pending}개 (manifest: {manifest_path})")
+        # 모든 작업이 완료되었으면 다음 실행이 처음부터 캡처하도록 저널 삭제
+        if all(t["status"] == "done" for t in self.coordinator.tasks.values()):
+            for journal in self.coordinator.journals.values():
+                journal.clear()
+        return manifest_path
+
+
+def create_driver(browser_type, headless=True):
+    from selenium import webdriver
+    from selenium.webdriver.edge.service import Service as EdgeService
+
+    options = webdriver.ChromeOptions() if browser_type == "chrome" else webdriver.EdgeOptions()
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--hide-scrollbars")
+    if browser_type == "chrome":
+        return webdriver.Chrome(options=options)
+    if browser_type == "edge":
+        edge_driver_path = os.path.join(os.getcwd(), "msedgedriver.exe")
+        if os.path.exists(edge_driver_path):
+            return webdriver.Edge(service=EdgeService(executable_path=edge_driver_path), options=options)
+        return webdriver.Edge(options=options)
+    raise ValueError(f"지원하지 않는 브라우저: {browser_type}")
+
+
+def run_worker(coordinator_address, browsers, user_id=None, user_pw=None, worker_name=None, headless=True, token=None):
+    """코디네이터에서 샤드를 받아 캡처하고 결과를 보냅니다. 모든 작업이 끝나면 반환합니다."""
+    from selenium.common.exceptions import WebDriverException
+
+    from autologin import login
+    from screenshot import (capture_breakpoint, disable_deterministic_rendering, enable_deterministic_rendering,
+                            open_page)
+
+    host, port = coordinator_address.rsplit(":", 1)
+    worker_name = worker_name or f"{socket.gethostname()}-{os.getpid()}"
+    drivers = {}
+    # 브라우저별 렌더링 고정 스크립트 식별자 (드라이버를 종료하기 전에 해제)
+    clock_scripts = {}
+    current_urls = {}
+    work_dir = tempfile.mkdtemp(prefix="distributed_worker_")
+
+    with socket.create_connection((host, int(port))) as sock:
+        rfile = sock.makefile("rb")
+        wfile = sock.makefile("wb")
+        send_message(wfile, {"type": "hello", "worker": worker_name, "browsers": browsers, "token": token})
+        config = receive_message(rfile)
+        if config["type"] == "error":
+            raise RuntimeError(config["error"])
+
+        def get_driver(browser_type):
+            if browser_type not in drivers:
+                driver = create_driver(browser_type, headless)
+                driver.set_script_timeout(5)
+                if config.get("login_url") and user_id and user_pw:
+                    if not login(driver, user_id, user_pw, config["login_url"]):
+                        try:
+                            driver.quit()
+                        except WebDriverException:
+                            pass
+                        raise LoginFailedError(f"{browser_type} 로그인 실패")
+                if config.get("deterministic"):
+                    clock_scripts[browser_type] = enable_deterministic_rendering(driver)
+                drivers[browser_type] = driver
+            return drivers[browser_type]
+
+        revoked = set()
+        try:
+            while True:
+                send_message(wfile, {"type": "get_shard"})
+                reply = receive_message(rfile)
+                if reply["type"] == "done":
+                    break
+                if reply["type"] == "wait":
+                    time.sleep(WORKER_POLL_INTERVAL)
+                    continue
+
+                for task in reply["tasks"]:
+                    if task["task_id"] in revoked:
+                        continue
+                    start = time.perf_counter()
+                    result = {"type": "result", "task_id": task["task_id"]}
+                    browser_type = task["browser"]
+                    try:
+                        driver = get_driver(browser_type)
+                        if current_urls.get(browser_type) != task["url"]:
+                            open_page(driver, task["url"], browser_type)
+                            current_urls[browser_type] = task["url"]
+                        path = capture_breakpoint(driver, task["url"], work_dir, browser_type,
+                                                  task["width"], task["size_name"],
+                                                  deterministic=config.get("deterministic"))
+                        with open(path, "rb") as f:
+                            result.update(ok=True, png=base64.b64encode(f.read()).decode("ascii"))
+                        os.remove(path)
+                    except LoginFailedError:
+                        # 더 이상 샤드를 받지 않고 종료 (연결이 끊기면 코디네이터가 작업을 다시 대기열에 넣음)
+                        raise
+                    except WebDriverException as e:
+                        # 드라이버가 종료되었을 수 있으므로 다음 작업에서 새로 생성
+                        driver = drivers.pop(browser_type, None)
+                        current_urls.pop(browser_type, None)
+                        clock_scripts.pop(browser_type, None)
+                        if driver:
+                            try:
+                                driver.quit()
+                            except WebDriverException:
+                                pass
+                        result.update(ok=False, error=str(e))
+                    except Exception as e:
+                        result.update(ok=False, error=str(e))
+                    result["duration"] = time.perf_counter() - start
+                    send_message(wfile, result)
+                    revoked.update(receive_message(rfile)["revoked"])
+        finally:
+            for browser_type, driver in drivers.items():
+                if browser_type in clock_scripts:
+                    disable_deterministic_rendering(driver, clock_scripts[browser_type])
+                try:
+                    driver.quit()
+                except WebDriverException:
+                    pass
+
+
+def run_local(args, urls):
+    """같은 PC에서 코디네이터와 여러 워커 프로세스를 실행합니다 (테스트 및 단일 PC 병렬 캡처용)."""
+    coordinator = Coordinator(urls, args.save_path, args.browsers, DEFAULT_BREAKPOINTS, login_url=args.login_url,
+                              shard_urls=args.shard_urls, deterministic=args.deterministic, token=args.token,
+                              base_url=args.base_url)
+    server = CoordinatorServer(coordinator, "127.0.0.1", args.port)
+    port = server.server_address[1]
+    command = [sys.executable, os.path.abspath(__file__), "worker", "--coordinator", f"127.0.0.1:{port}",
+               "--browsers", ",".join(args.browsers)]
+    if args.token:
+        command += ["--token", args.token]
+    if args.show_browser:
+        command.append("--show-browser")
+    workers = [subprocess.Popen(command) for _ in range(args.workers)]
+    try:
+        return server.run()
+    finally:
+        for worker in workers:
+            try:
+                worker.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분산 스크린샷 캡처 (코디네이터/워커)")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    def add_coordinator_args(p):
+        p.add_argument("--base-url", required=True, help="스크린샷 페이지 기본 URL")
+        p.add_argument("--url-file", default="url.txt")
+        p.add_argument("--save-path", required=True)
+        p.add_argument("--browsers", default="chrome,edge")
+        p.add_argument("--shard-urls", type=int, default=DEFAULT_SHARD_URLS)
+        p.add_argument("--deterministic", action="store_true", help="렌더링 고정 모드로 캡처")
+        p.add_argument("--token", help="워커 접속 토큰")
+
+    coordinator_parser = sub.add_parser("coordinator")
+    add_coordinator_args(coordinator_parser)
+    coordinator_parser.add_argument("--host", default="0.0.0.0")
+    coordinator_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    local_parser = sub.add_parser("local")
+    add_coordinator_args(local_parser)
+    local_parser.add_argument("--port", type=int, default=0)
+    local_parser.add_argument("--workers", type=int, default=2)
+    local_parser.add_argument("--show-browser", action="store_true")
+
+    worker_parser = sub.add_parser("worker")
+    worker_parser.add_argument("--coordinator", required=True, help="host:port")
+    worker_parser.add_argument("--browsers", default="chrome")
+    worker_parser.add_argument("--name")
+    worker_parser.add_argument("--token")
+    worker_parser.add_argument("--show-browser", action="store_true")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args.browsers = [b.strip() for b in args.browsers.split(",") if b.strip()]
+
+    try:
+        if args.mode == "worker":
+            # 로그인 정보는 명령줄에 남지 않도록 환경 변수로 전달
+            run_worker(args.coordinator, args.browsers, os.environ.get("AUTOSCREENSHOT_ID"),
+                       os.environ.get("AUTOSCREENSHOT_PW"), args.name, not args.show_browser, args.token)
+            return
+
+        from screenshot import get_urls_from_file
+
+        base_url = args.base_url.rstrip('/')
+        urls = [urllib.parse.urljoin(base_url, path) for path in get_urls_from_file(args.url_file)]
+        args.login_url = urllib.parse.urljoin(base_url, 'login')
+        if args.mode == "local":
+            run_local(args, urls)
+        else:
+            coordinator = Coordinator(urls, args.save_path, args.browsers, DEFAULT_BREAKPOINTS,
+                                      login_url=args.login_url, shard_urls=args.shard_urls,
+                                      deterministic=args.deterministic, token=args.token, base_url=args.base_url)
+            CoordinatorServer(coordinator, args.host, args.port).run()
+    except RuntimeError as e:
+        logging.error(f"분산 캡처 실패: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,46 @@
+import argparse
+import contextlib
 import json
 import logging
 import os
 import platform  # OS 감지를 위해 추가
+import queue
 import threading
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, ttk
 import urllib.parse
 import sys # 추가
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.common.exceptions import WebDriverException # WebDriverException 임포트
-
 # 공용 모듈 임포트
-from autologin import login
-from screenshot import capture_screenshots, get_urls_from_file
-from compare_screenshots import run_comparison
-from apply_grid import process_screenshots
+# selenium, NumPy/PIL을 사용하는 모듈은 창이 뜨는 시간을 줄이기 위해 처음 사용할 때 임포트합니다.
+from metrics import Metrics
+from checkpoint import (JOURNAL_MAX_AGE, CaptureJournal, capture_settings, get_journal_path, journal_stale_reason,
+                        read_journal_header)
+from progress import CancelToken, ProgressBus, ProgressState
+
+# --- Configuration ---
+# 1. 작업 스레드의 진행 이벤트와 UI 요청을 처리하는 주기 (ms)
+UI_POLL_INTERVAL_MS = 100
+
+# 2. 진행 상황 패널에 표시할 작업 이름
+TASK_TITLES = {
+    "capture_chrome": "Chrome 캡처",
+    "capture_edge": "Edge 캡처",
+    "capture_safari": "Safari 캡처",
+    "compare": "비교",
+    "grid": "그리드",
+}
+
+# 3. 창이 표시된 뒤 백그라운드에서 미리 임포트할 모듈 (첫 버튼 클릭 지연을 줄이기 위함)
+PRELOAD_MODULES = ["selenium.webdriver", "autologin", "screenshot", "compare_screenshots", "apply_grid"]
+PRELOAD_DELAY_MS = 500
 
 class App:
     def __init__(self, root):
         self.root = root
         self.root.title("Selenium UI Test Tool - 통합 버전")
-        self.root.geometry("600x600")
+        self.root.geometry("600x860")
 
         self.chrome_driver = None
         self.edge_driver = None
@@ -31,6 +48,18 @@ class App:
         self.user_id = tk.StringVar()
         self.user_pw = tk.StringVar()
         self.save_path = tk.StringVar(value=os.getcwd())
+        self.deterministic = tk.BooleanVar(value=False)
+        self.resume_capture = tk.BooleanVar(value=True)
+        self.retry_failures = tk.BooleanVar(value=True)
+        self.network_cache = tk.BooleanVar(value=False)
+        self.width_sweep = tk.BooleanVar(value=False)
+
+        # 작업 스레드는 Tk 위젯을 직접 건드리지 않고, 진행 이벤트와 UI 요청을 큐에 넣음
+        self.progress = ProgressBus()
+        self._ui_calls = queue.Queue()
+        self.cancel_tokens = {}
+        self.progress_states = {}
+        self.progress_rows = {}
         
         # url.txt 경로를 실행 파일 기준으로 설정
         if getattr(sys, 'frozen', False):
@@ -73,6 +102,28 @@ class App:
         ttk.Entry(breakpoint_frame, textvariable=self.breakpoints_config, state="readonly").pack(side="left", fill="x", expand=True, padx=5, pady=5)
         ttk.Button(breakpoint_frame, text="편집", command=self.edit_breakpoints).pack(side="right", padx=5)
 
+        # 캡처 옵션 프레임
+        option_frame = ttk.LabelFrame(main_frame, text="캡처 옵션")
+        option_frame.pack(fill="x", pady=5)
+        capture_options = [
+            ("렌더링 고정 (애니메이션/캐럿/시간 고정)", self.deterministic),
+            ("추적/광고 차단 및 리소스 캐시", self.network_cache),
+            ("이어서 캡처", self.resume_capture),
+            ("실패 URL 재시도", self.retry_failures),
+            ("레이아웃 전환 너비 탐색", self.width_sweep),
+        ]
+        self.option_checks = {}
+        for i, (text, variable) in enumerate(capture_options):
+            check = ttk.Checkbutton(option_frame, text=text, variable=variable)
+            check.grid(row=i // 2, column=i % 2, padx=5, pady=2, sticky="w")
+            self.option_checks[str(variable)] = check
+        ttk.Button(option_frame, text="리소스 캐시 비우기", command=self.clear_network_cache).grid(
+            row=len(capture_options) // 2, column=1, padx=5, pady=2, sticky="w")
+        self.sweep_note = ttk.Label(option_frame, text="", wraplength=540)
+        self.sweep_note.grid(row=(len(capture_options) + 1) // 2, column=0, columnspan=2, padx=5, sticky="w")
+        # 너비 탐색 모드는 체크포인트 저널을 사용하지 않으므로 이어서 캡처/실패 재시도 옵션을 비활성화
+        self.width_sweep.trace_add("write", lambda *_: self._on_width_sweep_toggled())
+
         # 저장 경로 프레임
         path_frame = ttk.LabelFrame(main_frame, text="저장 경로")
         path_frame.pack(fill="x", pady=5)
@@ -120,11 +171,46 @@ class App:
         compare_frame.pack(fill="x", pady=5)
         self.compare_btn = ttk.Button(compare_frame, text="스크린샷 비교 실행", command=self.run_comparison_thread)
         self.compare_btn.pack(pady=10, fill="x", padx=10)
+        self.capture_all_btn = ttk.Button(compare_frame, text="Chrome + Edge 동시 캡처 후 비교", command=self.run_capture_all)
+        self.capture_all_btn.pack(pady=(0, 10), fill="x", padx=10)
+
+        # 진행 상황 프레임 (작업별 진행 막대, 처리 속도, 남은 시간, 취소 버튼)
+        self.progress_frame = ttk.LabelFrame(main_frame, text="진행 상황")
+        self.progress_frame.pack(fill="x", pady=5)
+        self.progress_frame.columnconfigure(1, weight=1)
 
         # 상태바
         self.status_label = ttk.Label(self.root, text="준비 완료", relief="sunken", anchor="w")
         self.status_label.pack(side="bottom", fill="x")
 
+        self.root.after(UI_POLL_INTERVAL_MS, self._poll_events)
+        self.root.after(PRELOAD_DELAY_MS, self._start_preload)
+
+    def _start_preload(self):
+        threading.Thread(target=self._preload_modules, daemon=True).start()
+
+    def _preload_modules(self):
+        # 창이 표시된 뒤 무거운 모듈을 미리 임포트. 실패해도 버튼을 누를 때 다시 임포트하며 오류를 표시함
+        for name in PRELOAD_MODULES:
+            try:
+                __import__(name)
+            except Exception as e:
+                logging.warning(f"모듈 미리 불러오기 실패: {name} - {e}")
+
+    def _on_width_sweep_toggled(self):
+        state = "disabled" if self.width_sweep.get() else "normal"
+        for variable in (self.resume_capture, self.retry_failures):
+            self.option_checks[str(variable)].config(state=state)
+        self.sweep_note.config(text="너비 탐색 모드에서는 이어서 캡처/실패 재시도를 사용하지 않으며, 먼저 탐색한 브라우저의 너비를 다른 브라우저도 사용합니다." if self.width_sweep.get() else "")
+
+    def clear_network_cache(self):
+        from network_cache import get_cache_dir, ResponseCache
+
+        cache_dir = get_cache_dir(self.save_path.get())
+        if os.path.isdir(cache_dir):
+            ResponseCache(cache_dir).clear_all()
+        self.update_status(f"리소스 캐시를 비웠습니다: {cache_dir}")
+
     def select_save_path(self):
         path = filedialog.askdirectory(initialdir=self.save_path.get())
         if path:
@@ -221,6 +307,8 @@ class App:
         driver_instance = getattr(self, f"{browser_type}_driver", None)
         if not driver_instance:
             try:
+                from selenium import webdriver
+                from selenium.webdriver.edge.service import Service as EdgeService
                 self.update_status(f"{browser_type.capitalize()} 드라이버 생성 중...")
                 if browser_type == 'chrome':
                     options = webdriver.ChromeOptions()
@@ -285,35 +373,41 @@ class App:
         threading.Thread(target=self._login_thread, args=(browser_type, uid, upw, login_url)).start() 
 
     def _login_thread(self, browser_type, uid, upw, login_url):
+        from selenium.common.exceptions import WebDriverException
+        from autologin import login
+
         driver = getattr(self, f"{browser_type}_driver")
         try:
             self.update_status(f"{browser_type.capitalize()} 로그인 시도 중...")
             
             if login(driver, uid, upw, login_url):
                 self.update_status(f"{browser_type.capitalize()} 로그인 성공")
-                getattr(self, f"{browser_type}_shot_btn").config(state="normal")
+                self.set_state(getattr(self, f"{browser_type}_shot_btn"), "normal")
             else:
                 self.update_status(f"{browser_type.capitalize()} 로그인 실패")
-                messagebox.showerror("로그인 실패", f"{browser_type.capitalize()} 로그인에 실패했습니다.")
+                self.show_message("showerror", "로그인 실패", f"{browser_type.capitalize()} 로그인에 실패했습니다.")
                 logging.error(f"로그인 실패: {browser_type.capitalize()} 로그인 실패")
                 # 드라이버가 닫혔을 수 있으므로, 드라이버 참조를 제거하여 새로 생성하도록 함
                 setattr(self, f"{browser_type}_driver", None)
-                getattr(self, f"{browser_type}_shot_btn").config(state="disabled")
+                self.set_state(getattr(self, f"{browser_type}_shot_btn"), "disabled")
         except WebDriverException as e:
             self.update_status(f"{browser_type.capitalize()} 드라이버 오류 발생")
-            messagebox.showerror("드라이버 오류", f"{browser_type.capitalize()} 드라이버 오류 발생: {e}")
+            self.show_message("showerror", "드라이버 오류", f"{browser_type.capitalize()} 드라이버 오류 발생: {e}")
             logging.error(f"드라이버 오류: {e}")
             setattr(self, f"{browser_type}_driver", None) # 드라이버 참조 초기화
-            getattr(self, f"{browser_type}_shot_btn").config(state="disabled")
+            self.set_state(getattr(self, f"{browser_type}_shot_btn"), "disabled")
         finally:
             # 어떤 경우에도 로그인 버튼은 다시 활성화
-            getattr(self, f"{browser_type}_login_btn").config(state="normal")
+            self.set_state(getattr(self, f"{browser_type}_login_btn"), "normal")
+
+    def _load_capture_inputs(self):
+        """URL 목록과 Breakpoint 설정을 읽습니다. 문제가 있으면 경고를 띄우고 None을 반환합니다."""
+        from screenshot import get_urls_from_file
 
-    def run_screenshot(self, browser_type):
         urls = get_urls_from_file(self.url_file_path.get())
         if not urls:
             messagebox.showwarning("URL 없음", "URL 파일을 찾을 수 없거나 내용이 비어 있습니다.")
-            return
+            return None
         
         try:
             breakpoints = json.loads(self.breakpoints_config.get())
@@ -321,92 +415,398 @@ class App:
                 raise ValueError("Breakpoint 설정이 올바른 딕셔너리 형식이 아닙니다.")
         except Exception as e:
             messagebox.showerror("설정 오류", f"Breakpoint 설정 파싱 오류: {e}")
+            return None
+
+        if not self.login_url.get().rstrip('/'):
+            messagebox.showerror("URL 오류", "로그인 URL이 비어있습니다. 스크린샷을 진행할 수 없습니다.")
+            self.update_status("오류: 로그인 URL 필요")
+            return None
+        return urls, breakpoints
+
+    def _capture_options(self):
+        # Tk 변수는 메인 스레드에서만 읽고, 작업 스레드에는 값으로 넘김
+        return {
+            "base_url": self.login_url.get().rstrip('/'),
+            "save_path": self.save_path.get(),
+            "deterministic": self.deterministic.get(),
+            "resume": self.resume_capture.get(),
+            "retry_failures": self.retry_failures.get(),
+            "network_cache": self.network_cache.get(),
+            # 응답 캐시를 사이트/계정별로 분리
+            "cache_namespace": f"{self.login_url.get().rstrip('/')}|{self.user_id.get()}",
+            "width_sweep": self.width_sweep.get(),
+            # 브라우저별 저널 최대 나이 (오래된 저널을 이어서 쓰기로 확인하면 None)
+            "journal_max_age": {},
+        }
+
+    def _journal_settings(self, browser_type, breakpoints, options):
+        # 이 값이 이전 실행과 다르면 저널의 스크린샷을 재사용하지 않음
+        return capture_settings(browser_type, options["base_url"], breakpoints, options["deterministic"],
+                                options["network_cache"])
+
+    def _confirm_resume(self, browser_type, breakpoints, options):
+        """오래된 저널이 있으면 이어서 캡처할지 묻고 결과를 options에 기록합니다 (메인 스레드에서 호출)."""
+        options["journal_max_age"][browser_type] = JOURNAL_MAX_AGE
+        if not options["resume"]:
             return
+        journal_path = get_journal_path(options["save_path"], browser_type)
+        settings = self._journal_settings(browser_type, breakpoints, options)
+        if journal_stale_reason(journal_path, settings) != "age":
+            return
+        hours = (time.time() - read_journal_header(journal_path)["started"]) / 3600
+        if messagebox.askyesno("이전 캡처 기록", f"{browser_type.capitalize()}: {hours:.0f}시간 전에 시작한 캡처 기록이 있습니다.\n"
+                                                 f"이미 캡처한 스크린샷을 재사용하고 남은 항목만 캡처할까요?\n"
+                                                 f"'아니요'를 누르면 처음부터 다시 캡처합니다."):
+            options["journal_max_age"][browser_type] = None
 
-        getattr(self, f"{browser_type}_shot_btn").config(state="disabled")
-        threading.Thread(target=self._screenshot_thread, args=(browser_type, urls, breakpoints)).start() 
+    def run_screenshot(self, browser_type):
+        inputs = self._load_capture_inputs()
+        if inputs is None:
+            return
+        urls, breakpoints = inputs
+        options = self._capture_options()
+        self._confirm_resume(browser_type, breakpoints, options)
 
-    def _screenshot_thread(self, browser_type, urls, breakpoints):
+        getattr(self, f"{browser_type}_shot_btn").config(state="disabled")
+        cancel = self.begin_task(f"capture_{browser_type}")
+        threading.Thread(target=self._screenshot_thread,
+                         args=(browser_type, urls, breakpoints, options, cancel)).start() 
+
+    def _screenshot_thread(self, browser_type, urls, breakpoints, options, cancel, notify=True):
+        """캡처를 실행하고, 모든 항목을 캡처했으면 True를 반환합니다."""
+        from selenium.common.exceptions import WebDriverException
+        from network_cache import NetworkInterceptor, ResponseCache, get_cache_dir
+        from pixel_cache import clear_run_cache
+        from screenshot import capture_screenshots
+        from width_sweep import capture_sweep
+
+        task = f"capture_{browser_type}"
         self.update_status(f"{browser_type.capitalize()} 스크린샷 캡처 중...")
         driver = getattr(self, f"{browser_type}_driver")
+        completed = False
         
         try:
             # 1, 2번 요청: 로그인 URL과 url.txt의 경로를 조합
-            base_url = self.login_url.get().rstrip('/')
-            if not base_url:
-                messagebox.showerror("URL 오류", "로그인 URL이 비어있습니다. 스크린샷을 진행할 수 없습니다.")
-                self.update_status("오류: 로그인 URL 필요")
-                return
-
-            full_urls = [urllib.parse.urljoin(base_url, path) for path in urls] # urljoin 사용
-
-            capture_screenshots(driver, full_urls, self.save_path.get(), browser_type, breakpoints)
+            full_urls = [urllib.parse.urljoin(options["base_url"], path) for path in urls] # urljoin 사용
+
+            # 체크포인트 저널: 이전 실행이 중단되었다면 남은 항목만 캡처
+            journal_path = get_journal_path(options["save_path"], browser_type)
+            if not options["resume"] and os.path.exists(journal_path):
+                os.remove(journal_path)
+            # 새 스크린샷이 생기므로 이전 실행의 디코딩 픽셀 캐시는 삭제
+            clear_run_cache(options["save_path"])
+
+            journal = CaptureJournal(journal_path, self._journal_settings(browser_type, breakpoints, options),
+                                     max_age=options["journal_max_age"].get(browser_type, JOURNAL_MAX_AGE))
+
+            metrics = Metrics()
+            # 네트워크 캐시: 첫 브라우저가 받은 정적 리소스를 다음 브라우저/실행에서 재사용
+            if options["network_cache"]:
+                cache = ResponseCache(get_cache_dir(options["save_path"]), options["cache_namespace"])
+                interceptor = NetworkInterceptor(driver, cache=cache)
+            else:
+                interceptor = contextlib.nullcontext()
+            with interceptor:
+                if options["width_sweep"]:
+                    # Breakpoint 유효 범위 안에서 레이아웃이 바뀌는 너비에서만 캡처
+                    transitions = capture_sweep(driver, full_urls, options["save_path"], browser_type, metrics=metrics,
+                                                deterministic=options["deterministic"], progress=self.progress,
+                                                cancel=cancel)
+                    completed = transitions is not False
+                else:
+                    completed = capture_screenshots(driver, full_urls, options["save_path"], browser_type, breakpoints, metrics,
+                                                    deterministic=options["deterministic"],
+                                                    journal=journal, retry_failures=options["retry_failures"],
+                                                    progress=self.progress, cancel=cancel)
+            self.export_metrics(metrics, f"capture_{browser_type}", options["save_path"])
+            if completed is False:
+                # 드라이버가 종료되었으므로 참조를 제거하고, 다시 로그인하면 남은 항목부터 이어서 캡처
+                setattr(self, f"{browser_type}_driver", None)
+                self.update_status(f"{browser_type.capitalize()} 스크린샷 캡처 중단")
+                self.show_message("showwarning", "중단", f"{browser_type.capitalize()} 드라이버 오류로 캡처가 중단되었습니다.\n다시 로그인한 뒤 스크린샷을 실행하면 남은 항목부터 이어서 캡처합니다.")
+                return False
+            if cancel.cancelled:
+                self.update_status(f"{browser_type.capitalize()} 스크린샷 캡처 취소됨")
+                return False
             self.update_status(f"{browser_type.capitalize()} 스크린샷 캡처 완료")
-            messagebox.showinfo("완료", f"{browser_type.capitalize()} 스크린샷 캡처가 완료되었습니다.")
+            if notify:
+                self.show_message("showinfo", "완료", f"{browser_type.capitalize()} 스크린샷 캡처가 완료되었습니다.")
+            return True
         except WebDriverException as e:
             self.update_status(f"{browser_type.capitalize()} 드라이버 오류 발생")
-            messagebox.showerror("드라이버 오류", f"{browser_type.capitalize()} 드라이버 오류 발생: {e}")
+            self.show_message("showerror", "드라이버 오류", f"{browser_type.capitalize()} 드라이버 오류 발생: {e}")
             logging.error(f"드라이버 오류: {e}")
+            try:
+                driver.quit() # 브라우저 프로세스가 남지 않도록 종료
+            except WebDriverException:
+                logging.warning("드라이버 종료 중 오류 발생 (이미 종료되었을 수 있음).")
             setattr(self, f"{browser_type}_driver", None) # 드라이버 참조 초기화
+            return False
         except Exception as e:
             self.update_status(f"{browser_type.capitalize()} 스크린샷 캡처 중 오류 발생")
-            messagebox.showerror("스크린샷 오류", f"{browser_type.capitalize()} 스크린샷 캡처 중 오류 발생: {e}")
+            self.show_message("showerror", "스크린샷 오류", f"{browser_type.capitalize()} 스크린샷 캡처 중 오류 발생: {e}")
             logging.error(f"스크린샷 캡처 오류: {e}")
+            return False
         finally:
-            getattr(self, f"{browser_type}_shot_btn").config(state="normal")
+            self.progress.emit("done", task, label="취소됨" if cancel.cancelled else ("완료" if completed else "중단"))
+            # 드라이버 참조가 초기화된 경우 다시 로그인해야 스크린샷을 실행할 수 있음
+            state = "normal" if getattr(self, f"{browser_type}_driver") else "disabled"
+            self.set_state(getattr(self, f"{browser_type}_shot_btn"), state)
+
+    def run_capture_all(self):
+        # Chrome과 Edge를 각각의 스레드에서 동시에 캡처한 뒤, 둘 다 끝나면 비교 실행
+        if not (self.chrome_driver and self.edge_driver):
+            messagebox.showwarning("로그인 필요", "Chrome과 Edge에 모두 로그인한 뒤 실행해주세요.")
+            return
+        if any(self.is_task_running(t) for t in ("capture_chrome", "capture_edge", "compare")):
+            messagebox.showwarning("실행 중", "진행 중인 캡처 또는 비교 작업이 끝난 뒤 실행해주세요.")
+            return
+        inputs = self._load_capture_inputs()
+        if inputs is None:
+            return
+        urls, breakpoints = inputs
+
+        options = self._capture_options()
+        for browser_type in ('chrome', 'edge'):
+            self._confirm_resume(browser_type, breakpoints, options)
+        for widget in (self.chrome_shot_btn, self.edge_shot_btn, self.compare_btn, self.capture_all_btn):
+            widget.config(state="disabled")
+        tokens = {b: self.begin_task(f"capture_{b}") for b in ('chrome', 'edge')}
+        compare_cancel = self.begin_task("compare")
+        threading.Thread(target=self._capture_all_thread,
+                         args=(urls, breakpoints, options, tokens, compare_cancel)).start()
+
+    def _capture_all_thread(self, urls, breakpoints, options, tokens, compare_cancel):
+        results = {}
+
+        def capture(browser_type):
+            results[browser_type] = self._screenshot_thread(browser_type, urls, breakpoints, options,
+                                                            tokens[browser_type], notify=False)
+
+        if options["network_cache"]:
+            # 리소스 캐시를 쓰면 두 브라우저가 같은 응답으로 렌더링하도록 이 사이트/계정의 캐시를 새로 채운 뒤 순서대로 캡처
+            # (동시에 캡처하면 두 브라우저가 각자 서버에서 받아오므로 입력이 같다고 보장할 수 없음)
+            # 다른 사이트/계정의 응답은 지우지 않음
+            from network_cache import ResponseCache, get_cache_dir
+
+            ResponseCache(get_cache_dir(options["save_path"]), options["cache_namespace"]).clear()
+            for b in tokens:
+                capture(b)
+        else:
+            threads = [threading.Thread(target=capture, args=(b,)) for b in tokens]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        try:
+            if all(results.get(b) for b in tokens) and not compare_cancel.cancelled:
+                self._run_comparison(options["save_path"], compare_cancel)
+            else:
+                self.progress.emit("done", "compare", label="건너뜀")
+                self.update_status("캡처가 모두 완료되지 않아 비교를 건너뜁니다.")
+                self.set_state(self.compare_btn, "normal")
+        finally:
+            self.set_state(self.capture_all_btn, "normal")
 
     def run_comparison_thread(self):
         self.update_status("스크린샷 비교 시작...")
         self.compare_btn.config(state="disabled")
-        threading.Thread(target=self._run_comparison).start()
+        cancel = self.begin_task("compare")
+        threading.Thread(target=self._run_comparison, args=(self.save_path.get(), cancel)).start()
 
     def run_apply_grid_thread(self):
         self.update_status("그리드 적용 시작...")
         self.grid_btn.config(state="disabled")
-        threading.Thread(target=self._run_apply_grid).start()
+        cancel = self.begin_task("grid")
+        threading.Thread(target=self._run_apply_grid, args=(self.save_path.get(), cancel)).start()
+
+    def _run_apply_grid(self, base_path, cancel):
+        from apply_grid import process_screenshots
+        from pixel_cache import get_run_cache
 
-    def _run_apply_grid(self):
-        base_path = self.save_path.get()
         source_dir = os.path.join(base_path, 'screenshots')
         output_dir = os.path.join(base_path, 'screenshots_with_grid')
         
         if not os.path.isdir(source_dir):
-            messagebox.showerror("폴더 없음", f"스크린샷 폴더를 찾을 수 없습니다: {source_dir}")
+            self.show_message("showerror", "폴더 없음", f"스크린샷 폴더를 찾을 수 없습니다: {source_dir}")
             self.update_status("오류: 스크린샷 폴더 없음")
-            self.grid_btn.config(state="normal")
+            self.progress.emit("done", "grid", label="오류")
+            self.set_state(self.grid_btn, "normal")
             return
 
+        result = "오류"
         try:
-            process_screenshots(source_dir, output_dir)
+            metrics = Metrics()
+            process_screenshots(source_dir, output_dir, metrics, progress=self.progress, cancel=cancel,
+                                cache=get_run_cache(base_path))
+            self.export_metrics(metrics, "grid", base_path)
+            if cancel.cancelled:
+                result = "취소됨"
+                self.update_status("그리드 적용 취소됨")
+                return
+            result = "완료"
             self.update_status(f"그리드 적용 완료. 결과 폴더: {output_dir}")
-            messagebox.showinfo("완료", f"그리드 적용이 완료되었습니다.\n결과가 저장된 폴더: {output_dir}")
+            self.show_message("showinfo", "완료", f"그리드 적용이 완료되었습니다.\n결과가 저장된 폴더: {output_dir}")
         except Exception as e:
             self.update_status("그리드 적용 중 오류 발생")
-            messagebox.showerror("그리드 적용 오류", f"그리드 적용 중 오류 발생: {e}")
+            self.show_message("showerror", "그리드 적용 오류", f"그리드 적용 중 오류 발생: {e}")
             logging.error(f"그리드 적용 오류: {e}")
         finally:
-            self.grid_btn.config(state="normal")
+            self.progress.emit("done", "grid", label=result)
+            self.set_state(self.grid_btn, "normal")
+
+    def _run_comparison(self, base_path, cancel):
+        from compare_screenshots import run_comparison
+        from pixel_cache import get_run_cache
 
-    def _run_comparison(self):
-        base_path = self.save_path.get()
+        result = "오류"
         try:
-            diff_count, output_path = run_comparison(base_path)
+            metrics = Metrics()
+            diff_count, output_path = run_comparison(base_path, metrics=metrics, progress=self.progress, cancel=cancel,
+                                                     cache=get_run_cache(base_path))
+            self.export_metrics(metrics, "compare", base_path)
+            if cancel.cancelled:
+                result = "취소됨"
+                self.update_status(f"비교 취소됨. 취소 전까지 {diff_count}개의 차이점 발견.")
+                return
+            result = "완료"
             self.update_status(f"비교 완료. 총 {diff_count}개의 차이점 발견.")
             if diff_count > 0:
-                messagebox.showinfo("비교 완료", f"총 {diff_count}개의 차이점을 발견했습니다.\n결과가 저장된 폴더: {output_path}")
+                self.show_message("showinfo", "비교 완료", f"총 {diff_count}개의 차이점을 발견했습니다.\n결과가 저장된 폴더: {output_path}")
             else:
-                messagebox.showinfo("비교 완료", "차이점을 발견하지 못했습니다.")
+                self.show_message("showinfo", "비교 완료", "차이점을 발견하지 못했습니다.")
         except Exception as e:
             self.update_status("비교 중 오류 발생")
-            messagebox.showerror("비교 오류", f"스크린샷 비교 중 오류 발생: {e}")
+            self.show_message("showerror", "비교 오류", f"스크린샷 비교 중 오류 발생: {e}")
             logging.error(f"스크린샷 비교 오류: {e}")
         finally:
-            self.compare_btn.config(state="normal")
+            self.progress.emit("done", "compare", label=result)
+            self.set_state(self.compare_btn, "normal")
+
+    def export_metrics(self, metrics, name, base_path):
+        # 저장 경로의 metrics 폴더에 JSONL과 Prometheus textfile 형식으로 내보내기
+        metrics_dir = os.path.join(base_path, "metrics")
+        try:
+            metrics.export_jsonl(os.path.join(metrics_dir, f"{name}.jsonl"))
+            metrics.export_prometheus(os.path.join(metrics_dir, f"{name}.prom"))
+        except OSError as e:
+            logging.warning(f"메트릭 저장 실패: {e}")
+
+    # --- 스레드 간 UI 처리 ---
+    def call_in_ui(self, func, *args, **kwargs):
+        """Tk 위젯 조작은 메인 스레드에서만 실행되도록 큐에 넣습니다."""
+        if threading.current_thread() is threading.main_thread():
+            func(*args, **kwargs)
+        else:
+            self._ui_calls.put((func, args, kwargs))
 
     def update_status(self, text):
-        self.status_label.config(text=text)
+        self.call_in_ui(self.status_label.config, text=text)
+
+    def show_message(self, kind, title, text):
+        # kind: "showinfo" / "showwarning" / "showerror"
+        self.call_in_ui(getattr(messagebox, kind), title, text)
+
+    def set_state(self, widget, state):
+        self.call_in_ui(widget.config, state=state)
+
+    def begin_task(self, task):
+        """작업의 취소 토큰을 만들고 진행 상황 패널에 표시 줄을 준비합니다 (메인 스레드에서 호출)."""
+        cancel = CancelToken()
+        self.cancel_tokens[task] = cancel
+        self.progress_states[task] = ProgressState(task)
+
+        row = self.progress_rows.get(task)
+        if row is None:
+            index = len(self.progress_rows)
+            row = {
+                "title": ttk.Label(self.progress_frame, text=TASK_TITLES.get(task, task), width=12),
+                "bar": ttk.Progressbar(self.progress_frame, mode="indeterminate"),
+                "info": ttk.Label(self.progress_frame, text="", width=34),
+                "cancel": ttk.Button(self.progress_frame, text="취소", width=6),
+            }
+            row["title"].grid(row=index, column=0, padx=5, pady=2, sticky="w")
+            row["bar"].grid(row=index, column=1, padx=5, pady=2, sticky="ew")
+            row["info"].grid(row=index, column=2, padx=5, pady=2, sticky="w")
+            row["cancel"].grid(row=index, column=3, padx=5, pady=2)
+            self.progress_rows[task] = row
+
+        # 전체 개수를 알기 전까지는 움직이는 막대로 표시
+        row["bar"].config(mode="indeterminate", value=0)
+        row["bar"].start(20)
+        row["info"].config(text="준비 중...")
+        row["cancel"].config(state="normal", command=lambda: self.cancel_task(task))
+        return cancel
+
+    def is_task_running(self, task):
+        state = self.progress_states.get(task)
+        return state is not None and not state.finished
+
+    def cancel_task(self, task):
+        cancel = self.cancel_tokens.get(task)
+        if cancel:
+            cancel.cancel()
+            self.progress_rows[task]["cancel"].config(state="disabled")
+            self.progress_rows[task]["info"].config(text="취소 중... (현재 항목 완료 후 중지)")
+
+    def _poll_events(self):
+        # 메인 스레드: 작업 스레드가 요청한 UI 변경과 진행 이벤트를 반영
+        try:
+            while True:
+                try:
+                    func, args, kwargs = self._ui_calls.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    func(*args, **kwargs)
+                except tk.TclError as e:
+                    logging.debug(f"UI 갱신 실패: {e}")
+
+            updated = set()
+            for event in self.progress.drain():
+                state = self.progress_states.setdefault(event.task, ProgressState(event.task))
+                state.update(event)
+                updated.add(event.task)
+                if event.kind == "done":
+                    self._finish_progress_row(event.task, event.label)
+            for task in updated:
+                self._refresh_progress_row(task)
+        finally:
+            self.root.after(UI_POLL_INTERVAL_MS, self._poll_events)
+
+    def _refresh_progress_row(self, task):
+        row = self.progress_rows.get(task)
+        state = self.progress_states[task]
+        if row is None or state.finished:
+            return
+        if state.total:
+            if str(row["bar"].cget("mode")) != "determinate":
+                row["bar"].stop()
+                row["bar"].config(mode="determinate")
+            row["bar"].config(maximum=state.total, value=state.done)
+        if not self.cancel_tokens[task].cancelled:
+            row["info"].config(text=state.describe())
+
+    def _finish_progress_row(self, task, result):
+        row = self.progress_rows.get(task)
+        if row is None:
+            return
+        state = self.progress_states[task]
+        row["bar"].stop()
+        row["bar"].config(mode="determinate", maximum=state.total or 1,
+                          value=state.done if state.total else (1 if result == "완료" else 0))
+        row["info"].config(text=f"{result} · {state.describe()}")
+        row["cancel"].config(state="disabled")
 
     def on_close(self):
+        # 진행 중인 작업은 다음 항목으로 넘어가기 전에 멈추도록 취소
+        for cancel in self.cancel_tokens.values():
+            cancel.cancel()
+        # 픽셀 캐시 모듈을 불러온 적이 없으면 이번 실행에서 만든 캐시도 없음
+        pixel_cache = sys.modules.get("pixel_cache")
+        if pixel_cache:
+            pixel_cache.clear_all_run_caches()
         if self.chrome_driver:
             self.chrome_driver.quit()
         if self.edge_driver:
@@ -415,9 +815,20 @@ class App:
             self.safari_driver.quit()
         self.root.destroy()
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Selenium UI Test Tool - 스크린샷 캡처/비교 GUI")
+    parser.add_argument("--save-path", help="저장 경로 초기값 (기본: 현재 폴더)")
+    parser.add_argument("--url-file", help="URL 파일 경로 초기값 (기본: data/url.txt)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     root = tk.Tk()
     app = App(root)
+    if args.save_path:
+        app.save_path.set(os.path.abspath(args.save_path))
+    if args.url_file:
+        app.url_file_path.set(os.path.abspath(args.url_file))
     root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
@@ -1,5 +1,24 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# onedir 빌드 (EXE + COLLECT): onefile과 달리 실행할 때마다 임시 폴더에 압축을 풀지 않으므로 창이 빨리 뜹니다.
+# 배포 시 dist/main 폴더 전체를 복사해야 합니다.
+
+# GUI에서 사용하지 않는 모듈 (벤치마크/분산 캡처 CLI, 테스트·문서 도구)
+EXCLUDES = [
+    'benchmarks',
+    'distributed',
+    'matplotlib',
+    'scipy',
+    'pandas',
+    'IPython',
+    'pytest',
+    'tkinter.test',
+    'lib2to3',
+    'pydoc_data',
+    'numpy.f2py',
+    'numpy.distutils',
+]
+
 
 a = Analysis(
     ['main.py'],
@@ -10,7 +29,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=EXCLUDES,
     noarchive=False,
     optimize=0,
 )
@@ -20,8 +39,7 @@ exe = EXE(
     pyz,
     a.scripts,
     [],
-    [],
-    [],
+    exclude_binaries=True,
     name='main',
     debug=False,
     bootloader_ignore_signals=False,
@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# --- Configuration ---
+# Prometheus 메트릭 이름 접두사
+METRIC_PREFIX = "autoscreenshot"
+
+# 레코드에서 Prometheus 라벨로 내보낼 키 (url/파일 단위로 구분)
+PROMETHEUS_LABEL_KEYS = ("stage", "browser", "breakpoint", "width", "url", "file")
+
+
+def get_peak_rss_bytes():
+    """현재 프로세스의 최대 RSS(바이트)를 반환합니다. 측정할 수 없으면 None."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS는 바이트, Linux는 KB 단위로 반환
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        mem = psutil.Process().memory_info()
+        return getattr(mem, "peak_wset", mem.rss)
+    except ImportError:
+        return None
+
+
+class Metrics:
+    """
+    URL/Breakpoint 단위의 단계별 소요 시간과 저장 바이트를 기록합니다.
+    여러 스레드에서 동시에 기록할 수 있습니다.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, bytes_written=0, **labels):
+        rec = {"stage": stage, "seconds": seconds, "bytes": bytes_written, "ts": time.time()}
+        rec.update(labels)
+        with self._lock:
+            self.records.append(rec)
+        return rec
+
+    @contextmanager
+    def stage(self, name, **labels):
+        """
+        with 블록의 소요 시간을 기록합니다.
+        블록 안에서 yield된 딕셔너리의 'bytes' 값을 설정하면 저장 바이트로 함께 기록됩니다.
+        """
+        extra = {"bytes": 0}
+        start = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.record(name, time.perf_counter() - start, extra.pop("bytes"), **{**labels, **extra})
+
+    def export_jsonl(self, path):
+        """레코드를 JSON Lines 형식으로 저장합니다. 마지막 줄에 최대 RSS를 기록합니다."""
+        with self._lock:
+            records = list(self.records)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.write(json.dumps({"stage": "process", "peak_rss_bytes": get_peak_rss_bytes(), "ts": time.time()}) + "\n")
+        logging.info(f"메트릭 저장 (JSONL): {path}")
+
+    def export_prometheus(self, path):
+        """
+        node_exporter textfile collector 형식으로 저장합니다.
+        수집기가 쓰기 도중의 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체합니다.
+        """
+        seconds = {}
+        counts = {}
+        nbytes = {}
+        with self._lock:
+            records = list(self.records)
+        for rec in records:
+            key = tuple((k, str(rec[k])) for k in PROMETHEUS_LABEL_KEYS if rec.get(k) is not None)
+            seconds[key] = seconds.get(key, 0.0) + rec["seconds"]
+            counts[key] = counts.get(key, 0) + 1
+            nbytes[key] = nbytes.get(key, 0) + rec["bytes"]
+
+        lines = [
+            f"# HELP {METRIC_PREFIX}_stage_seconds_total 단계별 누적 소요 시간(초)",
+            f"# TYPE {METRIC_PREFIX}_stage_seconds_total counter",
+        ]
+        lines += [f"{METRIC_PREFIX}_stage_seconds_total{_format_labels(k)} {v:.6f}" for k, v in seconds.items()]
+        lines += [
+            f"# HELP {METRIC_PREFIX}_stage_runs_total 단계별 실행 횟수",
+            f"# TYPE {METRIC_PREFIX}_stage_runs_total counter",
+        ]
+        lines += [f"{METRIC_PREFIX}_stage_runs_total{_format_labels(k)} {v}" for k, v in counts.items()]
+        lines += [
+            f"# HELP {METRIC_PREFIX}_bytes_written_total 단계별 저장 바이트",
+            f"# TYPE {METRIC_PREFIX}_bytes_written_total counter",
+        ]
+        lines += [f"{METRIC_PREFIX}_bytes_written_total{_format_labels(k)} {v}" for k, v in nbytes.items() if v]
+
+        peak_rss = get_peak_rss_bytes()
+        if peak_rss is not None:
+            lines += [
+                f"# HELP {METRIC_PREFIX}_peak_rss_bytes 프로세스 최대 RSS(바이트)",
+                f"# TYPE {METRIC_PREFIX}_peak_rss_bytes gauge",
+                f"{METRIC_PREFIX}_peak_rss_bytes {peak_rss}",
+            ]
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+        logging.info(f"메트릭 저장 (Prometheus): {path}")
+
+
+def _format_labels(label_items):
+    if not label_items:
+        return ""
+    escaped = []
+    for k, v in label_items:
+        v = v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{k}="{v}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def track(metrics, stage, **labels):
+    """metrics가 None이면 아무것도 기록하지 않는 with 블록을 반환합니다."""
+    if metrics is None:
+        return nullcontext({"bytes": 0})
+    return metrics.stage(stage, **labels)
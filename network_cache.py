@@ -0,0 +1,291 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import trio
+from selenium.common.exceptions import WebDriverException
+
+# --- Configuration ---
+# 1. 차단할 요청 URL 패턴 (Network.setBlockedURLs 와일드카드 형식)
+# 분석 도구, 광고, 동영상은 스크린샷 결과에 영향이 없거나 매번 달라지므로 차단합니다.
+DEFAULT_BLOCK_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*facebook.net*",
+    "*connect.facebook.com*",
+    "*hotjar.com*",
+    "*wcs.naver.net*",
+    "*analytics.kakao.com*",
+    "*.mp4*",
+    "*.webm*",
+    "*.m3u8*",
+    "*youtube.com/embed*",
+]
+
+# 2. 디스크 캐시에서 재사용할 정적 리소스 유형 (CDP Network.ResourceType)
+CACHEABLE_RESOURCE_TYPES = ["Image", "Font", "Stylesheet", "Script"]
+
+# 3. 응답 캐시 폴더 이름 (저장 경로 아래)과 유효 기간 (초).
+# 한 번의 캡처 실행(첫 브라우저가 채우고 다음 브라우저가 재생) 동안만 쓰도록 짧게 두며,
+# 기간이 지난 응답은 다시 받아옵니다 (그 사이 배포된 CSS/JS를 놓치지 않도록).
+CACHE_DIR_NAME = ".http_cache"
+DEFAULT_MAX_AGE = 60 * 60
+
+# 4. 저장/재생 시 제거할 응답 헤더 (본문은 압축이 풀린 상태로 저장되므로)
+DROPPED_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+# 5. 이 Cache-Control 지시어가 있는 응답은 저장하지 않음 (사용자별/저장 금지 리소스)
+UNCACHEABLE_DIRECTIVES = {"no-store", "private"}
+
+# 6. 이벤트 채널 크기. 채널이 가득 차면 이벤트가 버려지고 해당 요청이 멈추므로 넉넉하게 설정
+EVENT_BUFFER_SIZE = 1024
+
+
+class ResponseCache:
+    """
+    정적 리소스 응답(상태 코드, 헤더, 본문)을 (namespace, URL) 해시별로 디스크에 저장합니다.
+    namespace에는 기본 URL과 계정을 넣어 다른 사이트/계정의 응답이 섞이지 않도록 합니다.
+    """
+
+    def __init__(self, cache_dir, namespace="", max_age=DEFAULT_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self.max_age = max_age
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(f"{self.namespace}\n{url}".encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def get(self, url):
+        """캐시된 (상태 코드, 헤더 리스트, 본문 바이트)를 반환합니다. 없거나 만료되었으면 None."""
+        meta_path, body_path = self._paths(url)
+        try:
+            if time.time() - os.path.getmtime(meta_path) > self.max_age:
+                return None
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or meta.get("namespace", "") != self.namespace:
+            return None
+        return meta["status"], meta["headers"], body
+
+    def put(self, url, status, headers, body):
+        meta_path, body_path = self._paths(url)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # 본문을 먼저 교체한 뒤 메타데이터를 교체하여, 메타데이터가 있으면 본문도 있도록 함
+            with open(body_path + suffix, "wb") as f:
+                f.write(body)
+            os.replace(body_path + suffix, body_path)
+            with open(meta_path + suffix, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "namespace": self.namespace, "status": status, "headers": headers}, f)
+            os.replace(meta_path + suffix, meta_path)
+        except OSError as e:
+            logging.warning(f"응답 캐시 저장 실패: {url} - {e}")
+
+    def clear(self):
+        """이 namespace의 응답만 삭제합니다 (다른 사이트/계정의 응답은 유지)."""
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    namespace = json.load(f).get("namespace", "")
+            except (OSError, ValueError):
+                continue
+            if namespace != self.namespace:
+                continue
+            for path in (meta_path, meta_path[:-len(".json")] + ".body"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            removed += 1
+        return removed
+
+    def clear_all(self):
+        """namespace와 관계없이 캐시 폴더의 모든 응답을 삭제합니다."""
+        for name in os.listdir(self.cache_dir):
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+
+def get_cache_dir(base_path):
+    return os.path.join(base_path, CACHE_DIR_NAME)
+
+
+def _filter_headers(headers):
+    return [(h["name"], h["value"]) for h in headers if h["name"].lower() not in DROPPED_RESPONSE_HEADERS]
+
+
+def is_storable(request_headers, response_headers):
+    """
+    Cache-Control: no-store/private 응답, 쿠키를 설정하는 응답, Authorization 헤더가 있는 요청은
+    사용자별 내용일 수 있으므로 저장하지 않습니다.
+    """
+    if any(name.lower() == "authorization" for name in request_headers or {}):
+        return False
+    for h in response_headers:
+        name = h["name"].lower()
+        if name == "set-cookie":
+            return False
+        if name == "cache-control":
+            directives = {d.strip().split("=", 1)[0].lower() for d in h["value"].split(",")}
+            if directives & UNCACHEABLE_DIRECTIVES:
+                return False
+    return True
+
+
+class NetworkInterceptor:
+    """
+    캡처하는 동안 CDP로 요청을 가로채 지정한 패턴을 차단하고,
+    정적 리소스는 디스크 캐시에서 응답합니다 (첫 브라우저가 채운 캐시를 다음 브라우저/실행이 재사용).
+
+        with NetworkInterceptor(driver, cache=ResponseCache(get_cache_dir(save_path), namespace)):
+            capture_screenshots(driver, ...)
+
+    cache를 넘기지 않으면 요청 차단만 합니다.
+    """
+
+    def __init__(self, driver, block_patterns=None, cache=None):
+        self.driver = driver
+        self.block_patterns = DEFAULT_BLOCK_PATTERNS if block_patterns is None else block_patterns
+        self.cache = cache
+        self.stats = {"blocked_patterns": len(self.block_patterns), "hits": 0, "stored": 0, "errors": 0}
+        self._thread = None
+        self._ready = threading.Event()
+        self._trio_token = None
+        self._cancel_scope = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        if self.block_patterns:
+            try:
+                self.driver.execute_cdp_cmd('Network.enable', {})
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.block_patterns})
+            except WebDriverException as e:
+                logging.warning(f"요청 차단 설정 실패 (CDP 미지원 브라우저일 수 있음): {e}")
+
+        if self.cache is None:
+            return
+        self._thread = threading.Thread(target=self._thread_main, daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout=10):
+            logging.warning("응답 캐시 인터셉터를 시작하지 못했습니다. 캐시 없이 캡처합니다.")
+
+    def stop(self):
+        if self._thread and self._trio_token and self._cancel_scope:
+            try:
+                trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+            except trio.RunFinishedError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self.block_patterns:
+            try:
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+            except WebDriverException:
+                pass
+        logging.info(f"네트워크 캐시 통계: 재생 {self.stats['hits']}건, 저장 {self.stats['stored']}건, 오류 {self.stats['errors']}건")
+
+    def _thread_main(self):
+        try:
+            trio.run(self._run)
+        except Exception as e:
+            logging.warning(f"응답 캐시 인터셉터 종료: {e}")
+        finally:
+            # start()가 시간 초과까지 기다리지 않도록 실패 시에도 신호
+            self._ready.set()
+
+    async def _run(self):
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            patterns = []
+            for resource_type in CACHEABLE_RESOURCE_TYPES:
+                for stage in (devtools.fetch.RequestStage.REQUEST, devtools.fetch.RequestStage.RESPONSE):
+                    patterns.append(devtools.fetch.RequestPattern(
+                        url_pattern="*",
+                        resource_type=devtools.network.ResourceType(resource_type),
+                        request_stage=stage,
+                    ))
+            await session.execute(devtools.fetch.enable(patterns=patterns))
+            events = session.listen(devtools.fetch.RequestPaused, buffer_size=EVENT_BUFFER_SIZE)
+
+            async with trio.open_nursery() as nursery:
+                self._trio_token = trio.lowlevel.current_trio_token()
+                self._cancel_scope = nursery.cancel_scope
+                self._ready.set()
+                async for event in events:
+                    nursery.start_soon(self._handle, session, devtools, event)
+
+    async def _handle(self, session, devtools, event):
+        fetch = devtools.fetch
+        url = event.request.url
+        try:
+            if event.request.method != "GET":
+                await session.execute(fetch.continue_request(event.request_id))
+                return
+
+            if event.response_status_code is None and event.response_error_reason is None:
+                # 요청 단계: 캐시에 있으면 서버에 요청하지 않고 바로 응답
+                cached = self.cache.get(url)
+                if cached is None:
+                    await session.execute(fetch.continue_request(event.request_id))
+                    return
+                status, headers, body = cached
+                await session.execute(fetch.fulfill_request(
+                    event.request_id, status,
+                    response_headers=[fetch.HeaderEntry(name=n, value=v) for n, v in headers],
+                    body=base64.b64encode(body).decode("ascii"),
+                ))
+                self.stats["hits"] += 1
+                return
+
+            # 응답 단계: 정상 응답이면 본문을 받아 캐시에 저장한 뒤 같은 내용으로 응답
+            if event.response_status_code != 200:
+                await session.execute(fetch.continue_request(event.request_id))
+                return
+            raw_headers = [h.to_json() for h in event.response_headers or []]
+            if not is_storable(event.request.headers, raw_headers):
+                await session.execute(fetch.continue_request(event.request_id))
+                return
+            body, is_base64 = await session.execute(fetch.get_response_body(event.request_id))
+            body = base64.b64decode(body) if is_base64 else body.encode("utf-8")
+            headers = _filter_headers(raw_headers)
+            self.cache.put(url, 200, headers, body)
+            self.stats["stored"] += 1
+            await session.execute(fetch.fulfill_request(
+                event.request_id, 200,
+                response_headers=[fetch.HeaderEntry(name=n, value=v) for n, v in headers],
+                body=base64.b64encode(body).decode("ascii"),
+            ))
+        except Exception as e:
+            # 요청이 멈춘 채로 남지 않도록 가능한 경우 그대로 진행
+            self.stats["errors"] += 1
+            logging.debug(f"요청 가로채기 처리 오류: {url} - {e}")
+            try:
+                await session.execute(fetch.continue_request(event.request_id))
+            except Exception:
+                pass
@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import os
+import shutil
+import struct
+import threading
+
+import numpy as np
+from PIL import Image
+
+# --- Configuration ---
+# 1. 캐시 폴더 이름 (저장 경로 아래). 캐시는 한 저장 경로의 실행 동안만 사용하고,
+# 새 캡처를 시작하거나 프로그램을 종료할 때 삭제합니다.
+CACHE_DIR_NAME = ".pixel_cache"
+
+# 2. 캐시 최대 크기 (바이트). None이면 실행 중에는 삭제하지 않음 (작업 집합 전체를 보관해야
+# 비교에서 디코딩한 픽셀을 그리드 적용에서 다시 사용할 수 있음)
+DEFAULT_MAX_BYTES = None
+
+# 3. 디스크 여유 공간이 이보다 적어지면 캐시에 쓰지 않고 디코딩 결과를 바로 사용
+MIN_FREE_DISK_BYTES = 2 * 1024 ** 3
+
+# 3. 캐시 파일 헤더: 매직(4) + 버전(2) + 채널 수(2) + 너비(4) + 높이(4) + 원본 PNG SHA-256(32)
+HEADER_FORMAT = "<4sHHII32s"
+HEADER_MAGIC = b"APXC"
+HEADER_VERSION = 1
+# 픽셀 데이터가 정렬된 위치에서 시작하도록 헤더를 64바이트로 맞춤
+HEADER_SIZE = 64
+
+CACHE_FILE_SUFFIX = ".rgb"
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+class PixelCache:
+    """
+    디코딩된 PNG 픽셀을 메모리 맵 파일로 보관하는 캐시입니다.
+    같은 스크린샷은 실행당 최대 한 번만 디코딩되고, 이후에는 읽기 전용 NumPy 뷰로 제공됩니다.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (경로, 수정 시각, 크기) -> 내용 해시. 같은 실행에서 파일을 다시 해시하지 않기 위함
+        self._digests = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 캐시 크기는 시작할 때 한 번만 계산하고 이후에는 쓰기/삭제 시 갱신 (미스마다 폴더를 나열하지 않음)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _digest(self, png_path):
+        stat = os.stat(png_path)
+        key = (os.path.abspath(png_path), stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = file_sha256(png_path)
+            self._digests[key] = digest
+        return digest
+
+    def _entry_path(self, digest):
+        return os.path.join(self.cache_dir, digest.hex() + CACHE_FILE_SUFFIX)
+
+    def load_rgb(self, png_path):
+        """PNG를 (높이, 너비, 3) uint8 읽기 전용 배열로 반환합니다."""
+        digest = self._digest(png_path)
+        entry_path = self._entry_path(digest)
+        view = self._open_entry(entry_path, digest)
+        if view is not None:
+            return view
+
+        with Image.open(png_path) as img:
+            rgb = img.convert("RGB")
+        if not self._write_entry(entry_path, digest, rgb):
+            return np.asarray(rgb)
+        if self.max_bytes is not None and self._total_bytes > self.max_bytes:
+            self.evict()
+        view = self._open_entry(entry_path, digest)
+        if view is None:
+            # 캐시 폴더에 쓸 수 없는 경우 디코딩 결과를 그대로 사용
+            return np.asarray(rgb)
+        return view
+
+    def _open_entry(self, entry_path, digest):
+        try:
+            with open(entry_path, "rb") as f:
+                header = f.read(HEADER_SIZE)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.warning(f"픽셀 캐시 읽기 실패: {entry_path} - {e}")
+            return None
+
+        magic, version, channels, width, height, source_digest = struct.unpack_from(HEADER_FORMAT, header)
+        if magic != HEADER_MAGIC or version != HEADER_VERSION or channels != 3 or source_digest != digest:
+            logging.warning(f"픽셀 캐시 헤더가 올바르지 않아 다시 디코딩합니다: {entry_path}")
+            return None
+        if not width or not height or os.path.getsize(entry_path) != HEADER_SIZE + width * height * channels:
+            return None
+
+        # LRU 판단을 위해 사용 시각 갱신
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return np.memmap(entry_path, dtype=np.uint8, mode="r", offset=HEADER_SIZE, shape=(height, width, channels))
+
+    def _write_entry(self, entry_path, digest, rgb):
+        """캐시 항목을 씁니다. 디스크 공간이 부족하거나 쓰기에 실패하면 False를 반환합니다."""
+        size = HEADER_SIZE + rgb.width * rgb.height * 3
+        try:
+            if shutil.disk_usage(self.cache_dir).free - size < MIN_FREE_DISK_BYTES:
+                logging.warning(f"디스크 여유 공간이 부족하여 픽셀 캐시를 사용하지 않습니다: {self.cache_dir}")
+                return False
+        except OSError:
+            return False
+        header = struct.pack(HEADER_FORMAT, HEADER_MAGIC, HEADER_VERSION, 3, rgb.width, rgb.height, digest)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(header.ljust(HEADER_SIZE, b"\0"))
+                f.write(rgb.tobytes())
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            logging.warning(f"픽셀 캐시 저장 실패: {entry_path} - {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        with self._lock:
+            self._total_bytes += size
+        return True
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(CACHE_FILE_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """캐시 크기가 최대치를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다."""
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if self.max_bytes is None or total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    # Windows에서는 메모리 맵으로 열려 있는 파일을 삭제할 수 없으므로 다음 정리 때 삭제
+                    pass
+            self._total_bytes = total
+
+    def clear(self):
+        """캐시 항목을 모두 삭제합니다 (열려 있는 메모리 맵 때문에 삭제하지 못한 항목은 남음)."""
+        with self._lock:
+            self._digests = {}
+            remaining = 0
+            for _, size, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    remaining += size
+            self._total_bytes = remaining
+
+
+_run_caches = {}
+_run_caches_lock = threading.Lock()
+
+
+def get_run_cache(base_path):
+    """저장 경로별 실행 캐시(base_path/CACHE_DIR_NAME)를 반환합니다."""
+    key = os.path.abspath(base_path)
+    with _run_caches_lock:
+        if key not in _run_caches:
+            _run_caches[key] = PixelCache(os.path.join(key, CACHE_DIR_NAME))
+        return _run_caches[key]
+
+
+def clear_run_cache(base_path):
+    """저장 경로의 실행 캐시를 삭제합니다. 캐시 폴더가 없으면 아무것도 하지 않습니다."""
+    if os.path.isdir(os.path.join(os.path.abspath(base_path), CACHE_DIR_NAME)):
+        get_run_cache(base_path).clear()
+
+
+def clear_all_run_caches():
+    with _run_caches_lock:
+        caches = list(_run_caches.values())
+    for cache in caches:
+        cache.clear()
+
+
+def load_rgb(png_path, cache=None):
+    """PNG를 RGB 배열로 읽습니다. cache(PixelCache)를 넘기면 캐시를 통해 읽고, 없으면 매번 디코딩합니다."""
+    if cache is None:
+        with Image.open(png_path) as img:
+            return np.asarray(img.convert("RGB"))
+    return cache.load_rgb(png_path)
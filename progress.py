@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+# 진행 이벤트
+# kind: "start"(total 설정) / "item"(항목 하나 완료) / "done"(작업 종료)
+# task: 작업 이름 (예: "capture_chrome", "compare", "grid")
+ProgressEvent = namedtuple("ProgressEvent", ["kind", "task", "total", "bytes", "duration", "label", "ts"])
+
+# ETA 계산에 사용할 최근 항목 수 (처리 속도가 변해도 ETA가 빠르게 따라가도록)
+RATE_WINDOW = 20
+
+
+class CancelToken:
+    """작업 스레드가 항목 사이마다 확인하는 취소 신호입니다."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class ProgressBus:
+    """
+    작업 스레드가 진행 이벤트를 넣고, Tk 메인 루프가 주기적으로 꺼내 가는 큐입니다.
+    작업 스레드는 Tk 위젯을 직접 건드리지 않습니다.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def emit(self, kind, task, total=None, bytes=0, duration=None, label=None):
+        self._queue.put(ProgressEvent(kind, task, total, bytes, duration, label, time.time()))
+
+    def drain(self, limit=500):
+        """쌓인 이벤트를 최대 limit개까지 꺼내 반환합니다 (블로킹하지 않음)."""
+        events = []
+        try:
+            while len(events) < limit:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+
+def emit(progress, kind, task, **fields):
+    """progress가 None이면 아무것도 하지 않습니다."""
+    if progress is not None:
+        progress.emit(kind, task, **fields)
+
+
+def is_cancelled(cancel):
+    return cancel is not None and cancel.cancelled
+
+
+class ProgressState:
+    """한 작업의 진행 상황(완료 수, 처리 속도, 남은 시간)을 계산합니다."""
+
+    def __init__(self, task, total=None):
+        self.task = task
+        self.total = total
+        self.done = 0
+        self.bytes = 0
+        self.started = time.time()
+        self.finished = False
+        self._recent = []
+
+    def update(self, event):
+        if event.kind == "start":
+            # 재시도 등으로 start가 다시 오면 total만 갱신하고 시작 시각은 유지
+            self.total = event.total
+            if not self.done:
+                self.started = event.ts
+        elif event.kind == "item":
+            self.done += 1
+            self.bytes += event.bytes or 0
+            self._recent = (self._recent + [event.ts])[-RATE_WINDOW:]
+        elif event.kind == "done":
+            self.finished = True
+
+    @property
+    def rate(self):
+        """초당 처리 항목 수."""
+        if len(self._recent) >= 2 and self._recent[-1] > self._recent[0]:
+            return (len(self._recent) - 1) / (self._recent[-1] - self._recent[0])
+        elapsed = time.time() - self.started
+        return self.done / elapsed if self.done and elapsed > 0 else None
+
+    @property
+    def eta(self):
+        """남은 시간(초). 계산할 수 없으면 None."""
+        rate = self.rate
+        if not self.total or not rate:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    def describe(self):
+        parts = [f"{self.done}/{self.total}" if self.total else f"{self.done}"]
+        if self.rate:
+            parts.append(f"{self.rate:.2f}/s")
+        if self.eta is not None and not self.finished:
+            minutes, seconds = divmod(int(self.eta), 60)
+            parts.append(f"남은 시간 {minutes}:{seconds:02d}")
+        if self.bytes:
+            parts.append(f"{self.bytes / 2 ** 20:.1f} MB")
+        return " · ".join(parts)
@@ -3,14 +3,85 @@ import logging
 import os
 import re
 import time
+from contextlib import contextmanager
 from urllib.parse import urlparse
 
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import TimeoutException, UnexpectedAlertPresentException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from config import get_sorted_breakpoints
+from metrics import track
+from progress import emit, is_cancelled
+
+# --- 렌더링 고정 모드 ---
+# 애니메이션/트랜지션/캐럿/부드러운 스크롤을 끄고 글꼴 렌더링을 통일하는 스타일
+DETERMINISTIC_CSS = """
+*, *::before, *::after {
+  animation-duration: 0s !important;
+  animation-delay: 0s !important;
+  animation-iteration-count: 1 !important;
+  transition: none !important;
+  caret-color: transparent !important;
+  scroll-behavior: auto !important;
+  -webkit-font-smoothing: antialiased !important;
+  text-rendering: geometricPrecision !important;
+}
+html { scroll-behavior: auto !important; }
+"""
+
+# 시간에 따라 바뀌는 콘텐츠(날짜, 시계 등)가 브라우저 간에 동일하도록 고정할 시각 (epoch 초)
+DETERMINISTIC_EPOCH = 1704067200  # 2024-01-01 00:00:00 UTC
+
+# 문서마다 Date가 DETERMINISTIC_EPOCH에서 시작해 실제 시간 속도로 흐르도록 바꾸는 스크립트.
+# 가상 시간과 달리 타이머를 앞당기지 않으므로, 경과 시간을 재는 세션 만료/폴링 스크립트는 평소대로 동작합니다.
+DETERMINISTIC_CLOCK_SCRIPT = """
+(() => {
+  const RealDate = Date;
+  const offset = %d - RealDate.now();
+  function FixedDate(...args) {
+    if (!new.target) {
+      return new RealDate(RealDate.now() + offset).toString();
+    }
+    return args.length ? new RealDate(...args) : new RealDate(RealDate.now() + offset);
+  }
+  FixedDate.prototype = RealDate.prototype;
+  FixedDate.now = () => RealDate.now() + offset;
+  FixedDate.parse = RealDate.parse;
+  FixedDate.UTC = RealDate.UTC;
+  window.Date = FixedDate;
+})();
+""" % (DETERMINISTIC_EPOCH * 1000)
+
+# 스타일 주입, 포커스 해제, 동영상 정지, 남은 애니메이션 종료 후 글꼴 로드와 2프레임을 기다리는 스크립트
+STABILIZE_PAGE_SCRIPT = """
+const callback = arguments[arguments.length - 1];
+const css = arguments[0];
+let style = document.getElementById('__autoscreenshot_deterministic');
+if (!style) {
+  style = document.createElement('style');
+  style.id = '__autoscreenshot_deterministic';
+  style.textContent = css;
+  (document.head || document.documentElement).appendChild(style);
+}
+if (document.activeElement && document.activeElement.blur) {
+  document.activeElement.blur();
+}
+document.querySelectorAll('video, audio').forEach((media) => {
+  try { media.pause(); media.currentTime = 0; } catch (e) {}
+});
+if (document.getAnimations) {
+  document.getAnimations().forEach((animation) => {
+    try { animation.finish(); } catch (e) { animation.pause(); animation.currentTime = 0; }
+  });
+}
+window.scrollTo(0, 0);
+const fontsReady = document.fonts ? document.fonts.ready : Promise.resolve();
+fontsReady.then(() => {
+  window.requestAnimationFrame(() => { window.requestAnimationFrame(callback); });
+});
+"""
 
 def get_urls_from_file(file_path):
     try:
@@ -21,24 +92,29 @@ def get_urls_from_file(file_path):
         logging.error(f"오류: {file_path} 파일을 찾을 수 없습니다.")
         return []
 
-def capture_full_page_screenshot(driver, path):
+def capture_full_page_screenshot(driver, path, metrics=None, labels=None):
+    labels = labels or {}
     try:
-        page_rect = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})
-        screenshot_config = {
-            'captureBeyondViewport': True,
-            'fromSurface': True,
-            'clip': {
-                'width': page_rect['cssContentSize']['width'],
-                'height': page_rect['cssContentSize']['height'],
-                'x': 0,
-                'y': 0,
-                'scale': 1
-            },
-        }
-        base64_png = driver.execute_cdp_cmd('Page.captureScreenshot', screenshot_config)
-        bytes_data = base64.urlsafe_b64decode(base64_png['data'])
-        with open(path, "wb") as f:
-            f.write(bytes_data)
+        with track(metrics, "cdp_capture", **labels):
+            page_rect = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})
+            screenshot_config = {
+                'captureBeyondViewport': True,
+                'fromSurface': True,
+                'clip': {
+                    'width': page_rect['cssContentSize']['width'],
+                    'height': page_rect['cssContentSize']['height'],
+                    'x': 0,
+                    'y': 0,
+                    'scale': 1
+                },
+            }
+            base64_png = driver.execute_cdp_cmd('Page.captureScreenshot', screenshot_config)
+        with track(metrics, "decode", **labels):
+            bytes_data = base64.urlsafe_b64decode(base64_png['data'])
+        with track(metrics, "write", **labels) as rec:
+            with open(path, "wb") as f:
+                f.write(bytes_data)
+            rec["bytes"] = len(bytes_data)
     except Exception as e:
         logging.error(f"CDP 전체 페이지 스크린샷 캡처 중 오류 발생: {e}")
         try:
@@ -46,7 +122,158 @@ def capture_full_page_screenshot(driver, path):
         except WebDriverException:
             logging.warning("드라이버가 이미 종료되어 스크린샷을 저장할 수 없습니다.")
 
-def capture_screenshots(driver, urls, base_path, browser_type, breakpoints):
+def enable_deterministic_rendering(driver):
+    """
+    CDP로 모션 감소 미디어를 에뮬레이션하고, 애니메이션 타임라인을 멈추고,
+    이후 열리는 문서의 Date 시작 시각을 고정합니다.
+    설정은 드라이버에 계속 남으므로 캡처가 끝나면 반환된 식별자로 disable_deterministic_rendering을 호출합니다.
+    가상 시간 정책은 세션 전체에 설정하지 않습니다 (타이머가 앞당겨져 자동 로그아웃 등이 실행될 수 있음).
+    """
+    commands = [
+        ('Emulation.setEmulatedMedia', {'features': [{'name': 'prefers-reduced-motion', 'value': 'reduce'}]}),
+        ('Animation.enable', {}),
+        ('Animation.setPlaybackRate', {'playbackRate': 0}),
+    ]
+    for cmd, params in commands:
+        try:
+            driver.execute_cdp_cmd(cmd, params)
+        except WebDriverException as e:
+            logging.warning(f"렌더링 고정 설정 실패 ({cmd}): {e}")
+    try:
+        result = driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': DETERMINISTIC_CLOCK_SCRIPT})
+        return result.get('identifier')
+    except WebDriverException as e:
+        logging.warning(f"렌더링 고정 설정 실패 (Page.addScriptToEvaluateOnNewDocument): {e}")
+        return None
+
+def disable_deterministic_rendering(driver, identifier=None):
+    """
+    enable_deterministic_rendering의 설정을 되돌립니다. 로그인한 드라이버를 다음 실행에서 그대로 쓰므로,
+    렌더링 고정을 끈 실행이나 다시 켠 실행에 이전 설정(Date 스크립트 등)이 남거나 쌓이지 않도록 합니다.
+    """
+    commands = [
+        ('Animation.setPlaybackRate', {'playbackRate': 1}),
+        ('Animation.disable', {}),
+        ('Emulation.setEmulatedMedia', {'features': []}),
+    ]
+    if identifier:
+        commands.insert(0, ('Page.removeScriptToEvaluateOnNewDocument', {'identifier': identifier}))
+    for cmd, params in commands:
+        try:
+            driver.execute_cdp_cmd(cmd, params)
+        except Exception as e:
+            # 드라이버가 이미 종료된 경우에는 되돌릴 설정도 없음 (종료된 드라이버는 연결 오류를 냄)
+            logging.debug(f"렌더링 고정 해제 실패 ({cmd}): {e}")
+
+@contextmanager
+def deterministic_rendering(driver, enabled=True):
+    """with 블록 안에서만 렌더링 고정 설정을 적용합니다. enabled가 False이면 아무것도 하지 않습니다."""
+    if not enabled:
+        yield
+        return
+    identifier = enable_deterministic_rendering(driver)
+    try:
+        yield
+    finally:
+        disable_deterministic_rendering(driver, identifier)
+
+def stabilize_page(driver):
+    """현재 페이지에 렌더링 고정 스타일을 적용하고 글꼴 로드가 끝날 때까지 기다립니다."""
+    try:
+        driver.execute_async_script(STABILIZE_PAGE_SCRIPT, DETERMINISTIC_CSS)
+    except TimeoutException:
+        logging.warning("렌더링 고정 대기 시간 초과 (글꼴 로드 미완료). 현재 상태로 캡처합니다.")
+
+@contextmanager
+def paused_page_scripts(driver):
+    """
+    캡처하는 동안만 페이지 스크립트 실행을 멈춰 타이머/시계가 화면을 바꾸지 않도록 합니다.
+    끝나면 실행을 다시 허용하므로 다음 페이지부터는 실제 시간으로 동작합니다.
+    """
+    try:
+        driver.execute_cdp_cmd('Emulation.setScriptExecutionDisabled', {'value': True})
+    except WebDriverException as e:
+        logging.warning(f"스크립트 실행 정지 실패: {e}")
+    try:
+        yield
+    finally:
+        try:
+            driver.execute_cdp_cmd('Emulation.setScriptExecutionDisabled', {'value': False})
+        except WebDriverException:
+            pass
+
+def get_page_title(url):
+    parsed_url = urlparse(url)
+    path_segments = [segment for segment in parsed_url.path.split('/') if segment]
+    
+    if path_segments:
+        base_name = path_segments[-1]
+    else:
+        base_name = "home"
+    
+    if parsed_url.query:
+        base_name += "_" + re.sub(r'[?&=]', '_', parsed_url.query)
+
+    return re.sub(r'[^a-zA-Z0-9_.-]', '', base_name) # 파일명으로 부적합한 문자 제거
+
+def capture_breakpoint(driver, url, base_path, browser_type, width, size_name, metrics=None, deterministic=False):
+    """현재 페이지를 지정한 너비로 조정한 뒤 캡처하고 저장 경로를 반환합니다."""
+    labels = {"browser": browser_type, "breakpoint": size_name, "width": width, "url": url}
+    with track(metrics, "resize", **labels):
+        # 24px 오프셋을 더하여 창 크기 설정
+        driver.set_window_size(width + 24, 1080)
+
+        # requestAnimationFrame을 사용하여 렌더링이 완료될 때까지 대기
+        driver.execute_async_script(
+            "const callback = arguments[arguments.length - 1];"
+            "window.requestAnimationFrame(() => {"
+            "  window.requestAnimationFrame(callback);"
+            "});"
+        )
+
+    directory = os.path.join(base_path, f"{browser_type}_{width} - {size_name}")
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    screenshot_path = os.path.join(directory, f"{get_page_title(url)}.png")
+    if deterministic:
+        with track(metrics, "stabilize", **labels):
+            stabilize_page(driver)
+        with paused_page_scripts(driver):
+            capture_full_page_screenshot(driver, screenshot_path, metrics, labels)
+    else:
+        capture_full_page_screenshot(driver, screenshot_path, metrics, labels)
+    logging.info(f"스크린샷 저장: {screenshot_path}")
+    return screenshot_path
+
+def is_session_alive(driver):
+    """드라이버 세션이 아직 명령에 응답하는지 확인합니다."""
+    try:
+        driver.execute_script("return 1")
+        return True
+    except (TimeoutException, UnexpectedAlertPresentException):
+        return True
+    except WebDriverException:
+        return False
+
+def open_page(driver, url, browser_type, metrics=None):
+    with track(metrics, "navigation", browser=browser_type, url=url):
+        driver.get(url)
+    with track(metrics, "readiness_wait", browser=browser_type, url=url):
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+
+def capture_screenshots(driver, urls, base_path, browser_type, breakpoints, metrics=None, deterministic=False,
+                        journal=None, retry_failures=False, progress=None, cancel=None):
+    """
+    URL 목록을 Breakpoint별로 캡처합니다.
+    journal(CaptureJournal)을 넘기면 완료된 (URL, Breakpoint)는 건너뛰고 결과를 기록하며,
+    retry_failures가 True이면 실패한 URL을 마지막에 한 번 더 캡처합니다.
+    progress(ProgressBus)에는 캡처 한 장마다 이벤트를 보내고, cancel(CancelToken)이 설정되면
+    다음 캡처 전에 멈춥니다 (저널이 있으면 다음 실행에서 이어서 캡처).
+    드라이버 오류로 중단되면 False를 반환합니다.
+    """
     if not urls:
         logging.warning("스크린샷을 캡처할 URL이 없습니다.")
         return
@@ -57,52 +284,76 @@ def capture_screenshots(driver, urls, base_path, browser_type, breakpoints):
     # 비동기 스크립트 타임아웃 설정 (5초)
     driver.set_script_timeout(5)
 
-    for url in urls:
-        try:
-            driver.get(url)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-
-            parsed_url = urlparse(url)
-            path_segments = [segment for segment in parsed_url.path.split('/') if segment]
-            
-            if path_segments:
-                base_name = path_segments[-1]
-            else:
-                base_name = "home"
-            
-            if parsed_url.query:
-                base_name += "_" + re.sub(r'[?&=]', '_', parsed_url.query)
-
-            page_title = re.sub(r'[^a-zA-Z0-9_.-]', '', base_name) # 파일명으로 부적합한 문자 제거
-
-            for width, size_name in sorted_breakpoints:
-                # 24px 오프셋을 더하여 창 크기 설정
-                driver.set_window_size(width + 24, 1080)
-
-                # requestAnimationFrame을 사용하여 렌더링이 완료될 때까지 대기
-                driver.execute_async_script(
-                    "const callback = arguments[arguments.length - 1];"
-                    "window.requestAnimationFrame(() => {"
-                    "  window.requestAnimationFrame(callback);"
-                    "});"
-                )
-
-                directory = os.path.join(base_path, f"{browser_type}_{width} - {size_name}")
-                if not os.path.exists(directory):
-                    os.makedirs(directory)
-
-                screenshot_path = os.path.join(directory, f"{page_title}.png")
-                capture_full_page_screenshot(driver, screenshot_path)
-                logging.info(f"스크린샷 저장: {screenshot_path}")
-        except WebDriverException as e:
-            logging.error(f"WebDriver 오류 발생: {url} 페이지 스크린샷 캡처 실패 - {e}")
-            if driver:
+    with deterministic_rendering(driver, deterministic):
+        task = f"capture_{browser_type}"
+        captured = 0
+        queue = list(urls)
+        for attempt in range(2 if retry_failures else 1):
+            if attempt > 0:
+                if not failed_urls:
+                    break
+                logging.info(f"실패한 URL {len(failed_urls)}개를 다시 캡처합니다.")
+                queue = failed_urls
+            failed_urls = []
+
+            if progress is not None:
+                remaining = sum(1 for url in queue for width, _ in sorted_breakpoints
+                                if not (journal and journal.is_done(url, width)))
+                emit(progress, "start", task, total=captured + remaining)
+
+            for url in queue:
+                if is_cancelled(cancel):
+                    logging.info(f"{browser_type} 캡처가 취소되었습니다.")
+                    return True
+
+                # 저널에 완료로 기록된 Breakpoint는 건너뜀
+                pending = [(width, size_name) for width, size_name in sorted_breakpoints
+                           if not (journal and journal.is_done(url, width))]
+                if not pending:
+                    logging.info(f"체크포인트: 이미 캡처됨, 건너뜀 - {url}")
+                    continue
+
                 try:
-                    driver.quit()
-                except WebDriverException:
-                    logging.warning("드라이버 종료 중 오류 발생 (이미 종료되었을 수 있음).")
-            return # 현재 URL 스크린샷 실패 시 다음 URL로 넘어가지 않고 함수 종료
-        except Exception as e:
-            logging.error(f"오류 발생: {url} 페이지 스크린샷 캡처 실패 - {e}")
\ No newline at end of file
+                    open_page(driver, url, browser_type, metrics)
+                    for width, size_name in pending:
+                        if is_cancelled(cancel):
+                            logging.info(f"{browser_type} 캡처가 취소되었습니다.")
+                            return True
+                        started = time.perf_counter()
+                        screenshot_path = capture_breakpoint(driver, url, base_path, browser_type, width, size_name,
+                                                             metrics, deterministic)
+                        if journal:
+                            journal.mark_done(url, width, size_name, screenshot_path)
+                        captured += 1
+                        size = os.path.getsize(screenshot_path) if os.path.exists(screenshot_path) else 0
+                        emit(progress, "item", task, bytes=size,
+                             duration=time.perf_counter() - started, label=f"{size_name} {url}")
+                except WebDriverException as e:
+                    if isinstance(e, TimeoutException) or is_session_alive(driver):
+                        # 느린 페이지/스크립트 시간 초과 등 세션이 살아 있는 오류는 해당 URL만 실패 처리
+                        logging.error(f"오류 발생: {url} 페이지 스크린샷 캡처 실패 (세션 유지) - {e}")
+                        failed_urls.append(url)
+                        if journal:
+                            for width, size_name in pending:
+                                if not journal.is_done(url, width):
+                                    journal.mark_failed(url, width, size_name, e)
+                        continue
+                    logging.error(f"WebDriver 오류 발생: {url} 페이지 스크린샷 캡처 실패 - {e}")
+                    if driver:
+                        try:
+                            driver.quit()
+                        except WebDriverException:
+                            logging.warning("드라이버 종료 중 오류 발생 (이미 종료되었을 수 있음).")
+                    return False # 현재 URL 스크린샷 실패 시 다음 URL로 넘어가지 않고 함수 종료 (저널에 남은 항목은 재실행 시 이어서 캡처)
+                except Exception as e:
+                    logging.error(f"오류 발생: {url} 페이지 스크린샷 캡처 실패 - {e}")
+                    failed_urls.append(url)
+                    if journal:
+                        for width, size_name in pending:
+                            if not journal.is_done(url, width):
+                                journal.mark_failed(url, width, size_name, e)
+
+    if journal and journal.is_complete(urls, [width for width, _ in sorted_breakpoints]):
+        logging.info("모든 항목 캡처 완료. 체크포인트 저널을 삭제합니다.")
+        journal.clear()
+    return True
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from checkpoint import JOURNAL_MAX_AGE
+from config import BREAKPOINT_VALID_RANGES
+from metrics import track
+from progress import emit, is_cancelled
+from screenshot import capture_breakpoint, deterministic_rendering, is_session_alive, open_page
+
+# --- Configuration ---
+# 1. 상한이 없는 Breakpoint(XL)를 탐색할 때 사용할 최대 너비
+SWEEP_MAX_WIDTH = 1920
+
+# 2. 처음 샘플링 간격 (px). 이 간격 안에서 레이아웃이 바뀌었다가 되돌아오는 경우는 놓칠 수 있음
+SWEEP_COARSE_STEP = 64
+
+# 3. Breakpoint 범위당 최대 캡처 수 (레이아웃이 너무 자주 바뀌는 페이지에서 캡처 수를 제한)
+SWEEP_MAX_CAPTURES_PER_RANGE = 8
+
+# 4. 시그니처에 포함할 최대 요소 수 (긴 페이지에서 스크립트 실행 시간을 제한)
+SIGNATURE_MAX_ELEMENTS = 1500
+
+# 5. 탐색한 너비를 저장할 파일 (저장 경로 아래). 먼저 탐색한 브라우저의 너비를 다른 브라우저가 그대로 사용하여
+# 두 브라우저의 폴더 이름('{브라우저}_{너비} - {Breakpoint}')이 일치하도록 함
+SWEEP_WIDTHS_FILE_NAME = ".sweep_widths.json"
+
+# 6. 저장된 너비를 재사용할 최대 나이 (초). 더 오래되었으면 다시 탐색
+SWEEP_WIDTHS_MAX_AGE = JOURNAL_MAX_AGE
+
+# 요소별 레이아웃 구조를 수집하는 스크립트.
+# 너비에 비례해 연속적으로 변하는 좌표 대신, 표시 여부/display 값과
+# 자식 요소가 몇 줄·몇 열로 배치되는지를 사용하므로 유동 레이아웃에서도
+# 미디어 쿼리나 줄바꿈이 일어나는 너비에서만 값이 바뀝니다.
+LAYOUT_SIGNATURE_SCRIPT = """
+const maxElements = arguments[0];
+const result = [];
+const elements = document.body ? document.body.querySelectorAll('*') : [];
+for (let i = 0; i < elements.length && result.length < maxElements; i++) {
+  const el = elements[i];
+  const style = window.getComputedStyle(el);
+  const rect = el.getBoundingClientRect();
+  const visible = style.display !== 'none' && style.visibility !== 'hidden' && rect.width > 0 && rect.height > 0;
+  let rows = 0, columns = 0;
+  if (visible && el.children.length > 1) {
+    const tops = new Set(), lefts = new Set();
+    for (const child of el.children) {
+      // 인라인 요소는 글자 줄바꿈마다 위치가 바뀌므로 제외
+      if (window.getComputedStyle(child).display === 'inline') continue;
+      const r = child.getBoundingClientRect();
+      if (r.width > 0 && r.height > 0) {
+        tops.add(Math.round(r.top));
+        lefts.add(Math.round(r.left));
+      }
+    }
+    rows = tops.size;
+    columns = lefts.size;
+  }
+  result.push([el.tagName, visible ? style.display : 'none', style.position, style.flexDirection, rows, columns]);
+}
+return result;
+"""
+
+
+def layout_signature(driver, width):
+    """창 너비를 바꾸고 스크린샷 없이 레이아웃 구조의 해시를 반환합니다."""
+    driver.set_window_size(width + 24, 1080)
+    driver.execute_async_script(
+        "const callback = arguments[arguments.length - 1];"
+        "window.requestAnimationFrame(() => {"
+        "  window.requestAnimationFrame(callback);"
+        "});"
+    )
+    boxes = driver.execute_script(LAYOUT_SIGNATURE_SCRIPT, SIGNATURE_MAX_ELEMENTS)
+    return hashlib.sha1(json.dumps(boxes).encode("utf-8")).hexdigest()
+
+
+def find_layout_transitions(signature_at, min_width, max_width, coarse_step=SWEEP_COARSE_STEP):
+    """
+    [min_width, max_width] 범위에서 레이아웃 시그니처가 바뀌는 너비를 찾습니다.
+    먼저 coarse_step 간격으로 샘플링한 뒤, 시그니처가 다른 구간만 이분 탐색하여
+    새 레이아웃이 시작되는 가장 작은 너비들을 반환합니다 (min_width 포함, 오름차순).
+    """
+    cache = {}
+
+    def sig(width):
+        if width not in cache:
+            cache[width] = signature_at(width)
+        return cache[width]
+
+    samples = list(range(min_width, max_width, coarse_step)) + [max_width]
+    transitions = [min_width]
+    for lo, hi in zip(samples, samples[1:]):
+        if sig(lo) == sig(hi):
+            continue
+        # sig(lo) != sig(hi): 구간 안에서 여러 번 바뀔 수 있으므로 재귀적으로 분할
+        stack = [(lo, hi)]
+        while stack:
+            a, b = stack.pop()
+            if b - a <= 1:
+                transitions.append(b)
+                continue
+            mid = (a + b) // 2
+            if sig(a) != sig(mid):
+                stack.append((a, mid))
+            if sig(mid) != sig(b):
+                stack.append((mid, b))
+    logging.info(f"레이아웃 탐색 {min_width}~{max_width}: 시그니처 계산 {len(cache)}회, 전환 너비 {len(transitions)}개")
+    transitions = sorted(set(transitions))
+    if len(transitions) > SWEEP_MAX_CAPTURES_PER_RANGE:
+        logging.warning(f"전환 너비가 너무 많아 {SWEEP_MAX_CAPTURES_PER_RANGE}개로 줄입니다: {min_width}~{max_width}")
+        step = (len(transitions) - 1) / (SWEEP_MAX_CAPTURES_PER_RANGE - 1)
+        transitions = sorted({transitions[round(i * step)] for i in range(SWEEP_MAX_CAPTURES_PER_RANGE)})
+    return transitions
+
+
+def sweep_breakpoints(driver, url, browser_type, valid_ranges=BREAKPOINT_VALID_RANGES, max_width=SWEEP_MAX_WIDTH,
+                      coarse_step=SWEEP_COARSE_STEP, metrics=None):
+    """
+    현재 페이지의 Breakpoint 유효 범위마다 레이아웃이 바뀌는 너비를 찾아
+    {Breakpoint 이름: [너비, ...]}로 반환합니다.
+    """
+    open_page(driver, url, browser_type, metrics)
+    result = {}
+    for name, (min_w, max_w) in valid_ranges.items():
+        upper = max_w if max_w is not None else max(max_width, min_w)
+        with track(metrics, "sweep", browser=browser_type, breakpoint=name, url=url):
+            result[name] = find_layout_transitions(lambda w: layout_signature(driver, w), min_w, upper, coarse_step)
+    return result
+
+
+_widths_locks = {}
+_widths_locks_guard = threading.Lock()
+
+
+def _widths_lock(path):
+    # 같은 프로세스에서 두 브라우저가 동시에 캡처할 때 같은 URL을 한 번만 탐색하도록 파일별 잠금
+    with _widths_locks_guard:
+        return _widths_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def _load_widths(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_widths(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def shared_breakpoints(driver, url, browser_type, widths_path, valid_ranges=BREAKPOINT_VALID_RANGES,
+                       max_width=SWEEP_MAX_WIDTH, coarse_step=SWEEP_COARSE_STEP, metrics=None):
+    """
+    widths_path에 이 URL의 최근 탐색 결과가 있으면 그대로 사용하고, 없으면 탐색한 뒤 저장합니다.
+    Breakpoint 범위 설정이 바뀐 경우에도 다시 탐색합니다.
+    """
+    with _widths_lock(widths_path):
+        data = _load_widths(widths_path)
+        entry = data.get(url)
+        if (entry and time.time() - entry.get("ts", 0) <= SWEEP_WIDTHS_MAX_AGE
+                and entry.get("ranges") == {k: list(v) for k, v in valid_ranges.items()}):
+            logging.info(f"저장된 전환 너비 사용 ({entry['browser']}에서 탐색): {url}")
+            open_page(driver, url, browser_type, metrics)
+            return entry["widths"]
+
+        widths = sweep_breakpoints(driver, url, browser_type, valid_ranges, max_width, coarse_step, metrics)
+        data = _load_widths(widths_path)
+        data[url] = {"widths": widths, "browser": browser_type, "ts": time.time(),
+                     "ranges": {k: list(v) for k, v in valid_ranges.items()}}
+        try:
+            _save_widths(widths_path, data)
+        except OSError as e:
+            logging.warning(f"전환 너비 저장 실패: {widths_path} - {e}")
+        return widths
+
+
+def capture_sweep(driver, urls, base_path, browser_type, valid_ranges=BREAKPOINT_VALID_RANGES, metrics=None,
+                  deterministic=False, max_width=SWEEP_MAX_WIDTH, coarse_step=SWEEP_COARSE_STEP, progress=None,
+                  cancel=None):
+    """
+    URL마다 레이아웃 전환 너비를 탐색하고, 그 너비에서만 스크린샷을 캡처합니다.
+    저장 폴더 이름은 일반 캡처와 같은 '{브라우저}_{너비} - {Breakpoint}' 형식입니다.
+    탐색 결과는 base_path의 SWEEP_WIDTHS_FILE_NAME에 저장되며, 다른 브라우저는 같은 너비를 재사용하므로
+    브라우저별 폴더가 비교 단계에서 짝을 이룹니다. 체크포인트 저널(이어서 캡처/실패 재시도)은 사용하지 않습니다.
+    캡처할 너비 수는 탐색 전에는 알 수 없으므로 진행 이벤트는 URL 단위로 보냅니다.
+    시간 초과 등 세션이 살아 있는 오류는 해당 URL만 건너뜁니다.
+    URL별 전환 너비 목록을 반환하고, 드라이버 세션이 끊겨 중단되면 False를 반환합니다.
+    """
+    driver.set_script_timeout(5)
+
+    widths_path = os.path.join(base_path, SWEEP_WIDTHS_FILE_NAME)
+    os.makedirs(base_path, exist_ok=True)
+    task = f"capture_{browser_type}"
+    emit(progress, "start", task, total=len(urls))
+    transitions = {}
+    with deterministic_rendering(driver, deterministic):
+        for url in urls:
+            if is_cancelled(cancel):
+                logging.info(f"{browser_type} 너비 탐색이 취소되었습니다.")
+                break
+            started = time.perf_counter()
+            written = 0
+            try:
+                widths = shared_breakpoints(driver, url, browser_type, widths_path, valid_ranges, max_width,
+                                            coarse_step, metrics)
+                transitions[url] = widths
+                for size_name, width_list in widths.items():
+                    for width in width_list:
+                        path = capture_breakpoint(driver, url, base_path, browser_type, width, size_name, metrics,
+                                                  deterministic)
+                        written += os.path.getsize(path) if os.path.exists(path) else 0
+            except WebDriverException as e:
+                if isinstance(e, TimeoutException) or is_session_alive(driver):
+                    # 느린 페이지/스크립트 시간 초과 등 세션이 살아 있는 오류는 해당 URL만 실패 처리
+                    logging.error(f"오류 발생: {url} 너비 탐색 실패 (세션 유지) - {e}")
+                else:
+                    logging.error(f"WebDriver 오류 발생: {url} 너비 탐색 실패 - {e}")
+                    try:
+                        driver.quit()
+                    except WebDriverException:
+                        logging.warning("드라이버 종료 중 오류 발생 (이미 종료되었을 수 있음).")
+                    return False
+            except Exception as e:
+                logging.error(f"오류 발생: {url} 너비 탐색 실패 - {e}")
+            emit(progress, "item", task, bytes=written, duration=time.perf_counter() - started, label=url)
+    return transitions